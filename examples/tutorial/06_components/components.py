@@ -16,8 +16,8 @@ class Card(Component):
     props = ["type", "button_text"]
 
     #
-    # For CSS specific to a component, put it here. The generated class name is unique per CssClass instance,
-    # so this can work to "scope" CSS.
+    # For CSS specific to a component, put it here. The generated class name is derived from the rules, so it
+    # won't clash with other classes, and identical rules are only added to the page once.
     card = CssClass(
         margin="1em",
         padding="1em",
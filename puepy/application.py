@@ -1,3 +1,4 @@
+import asyncio
 import itertools
 import random
 import sys
@@ -8,9 +9,12 @@ from puepy.storage import BrowserStorage
 from . import exceptions
 from .core import Page, t, Prop
 from .reactivity import ReactiveDict, Stateful
+from .timing import no_timings
+from .util import stable_hash
 from .runtime import (
     is_server_side,
     add_event_listener,
+    create_task,
     window,
 )
 
@@ -87,6 +91,63 @@ class DefaultIdGenerator:
         return self.prefix + self._int_to_base36(next(self.counter))
 
 
+class RefPathIdGenerator(DefaultIdGenerator):
+    """
+    An ID generator that derives each element's ID from its ref path within its page, rather than from a random prefix
+    and a counter.
+
+    An element's ID is a hash of its parent's ID and its own ref (or, for the page itself, the page's ref), so it
+    reflects the whole chain of refs from the page down to the element while costing the same at any depth. The same
+    element of the same page gets the same ID on every run and on every runtime, regardless of the order tags are
+    created in, which makes rendered HTML comparable and cacheable and lets DOM patching match elements up across
+    redraws. Hashes are 64 bits, so collisions are vanishingly unlikely.
+
+    Examples:
+        ``` py
+        app = Application(element_id_generator=RefPathIdGenerator())
+        ```
+    """
+
+    def __init__(self, prefix="pp-"):
+        """
+        Args:
+            prefix (str): The prefix to prepend to the generated IDs. Default is "pp-".
+        """
+        super().__init__(prefix)
+
+    def get_id_for_element(self, element):
+        """
+        Returns the ID for the given element, derived from its page and ref path.
+
+        Args:
+            element (Tag): The element for which the ID is to be generated.
+
+        Returns:
+            The ID for the given element.
+        """
+        ref = element.ref
+        if isinstance(ref, str) and ref.startswith("__"):
+            # Auto refs start with an id for the parent that depends on creation order, and the parent's ID already
+            # identifies it, so only the rest (the tag name and position) is used
+            ref = "__" + ref[ref.find(".") + 1 :]
+
+        if element.parent is not None:
+            path = f"{element.parent.element_id}/{ref}"
+        elif element.page is not element:
+            path = f"{element.page.ref}/{ref}"
+        else:
+            path = str(element.ref)
+        return self.prefix + self._int_to_base36(stable_hash(path))
+
+
+def _in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
 class Application(Stateful):
     """
     The main application class for PuePy. It manages the state, storage, router, and pages for the application.
@@ -94,7 +155,9 @@ class Application(Stateful):
     Attributes:
         state (ReactiveDict): The state object for the application.
         session_storage (BrowserStorage): The session storage object for the application.
-        local_storage (BrowserStorage): The local storage object for the application.
+        local_storage (BrowserStorage): The local storage object for the application. Pass
+            `storage_serializer=JsonSerializer()` to the constructor to make local and session storage typed and
+            cached; see `BrowserStorage`.
         router (Router): The router object for the application, if any
         default_page (Page): The default page to mount if no route is matched.
         active_page (Page): The currently active page.
@@ -102,9 +165,10 @@ class Application(Stateful):
         forbidden_page (Page): The page to mount when a 403 error occurs.
         unauthorized_page (Page): The page to mount when a 401 error occurs.
         error_page (Page): The page to mount when an error occurs.
+        timings (Timings): Records how long navigation, mounting and redrawing take, if instrumentation is enabled.
     """
 
-    def __init__(self, element_id_generator=None):
+    def __init__(self, element_id_generator=None, timings=None, storage_serializer=None):
         self.state = ReactiveDict(self.initial())
         self.add_context("state", self.state)
 
@@ -114,12 +178,15 @@ class Application(Stateful):
         else:
             from js import localStorage, sessionStorage
 
-            self.session_storage = BrowserStorage(sessionStorage, "session_storage")
-            self.local_storage = BrowserStorage(localStorage, "local_storage")
+            self.session_storage = BrowserStorage(sessionStorage, "session_storage", serializer=storage_serializer)
+            self.local_storage = BrowserStorage(localStorage, "local_storage", serializer=storage_serializer)
         self.router = None
         self._selector_or_element = None
         self.default_page = None
         self.active_page = None
+        self._mounted_page = None
+        self._mount_count = 0
+        self._loader_cache = {}
 
         self.not_found_page = GenericErrorPage
         self.forbidden_page = GenericErrorPage
@@ -127,6 +194,7 @@ class Application(Stateful):
         self.error_page = TracebackErrorPage
 
         self.element_id_generator = element_id_generator or DefaultIdGenerator()
+        self.timings = timings
 
     def install_router(self, router_class, **kwargs):
         """
@@ -141,7 +209,7 @@ class Application(Stateful):
         if not is_server_side:
             add_event_listener(window, "popstate", self._on_popstate)
 
-    def page(self, route=None, name=None):
+    def page(self, route=None, name=None, loaders=None):
         """
         A decorator for `Page` classes which adds the page to the application with a specified route and name.
 
@@ -150,6 +218,7 @@ class Application(Stateful):
         Args:
             route (str): The route for the page. Default is None.
             name (str): The name of the page. If left None, page class is used as the name.
+            loaders (dict): Async data loaders for the route, keyed by prop name (see `Page.loaders`). Default is None.
 
         Examples:
             ``` py
@@ -164,7 +233,7 @@ class Application(Stateful):
                 raise Exception("Router not installed")
 
             def decorator(func):
-                self.router.add_route(route, func, name=name)
+                self.router.add_route(route, func, name=name, loaders=loaders)
                 return func
 
             return decorator
@@ -197,6 +266,42 @@ class Application(Stateful):
         """
         Mounts a page onto the specified selector or element with optional path and page_kwargs.
 
+        If the page (or its route) has loaders, they are run first and the page is mounted once they finish. In the
+        browser, or when called from a running event loop, that happens in a task, and this method returns None; await
+        `mount_async` instead to get the page. Otherwise (eg, server side scripts), the loaders are run to completion
+        before returning.
+
+        Args:
+            selector_or_element: The selector or element on which to mount the page.
+            path: Optional path to match against the router. Defaults to None.
+            page_kwargs: Optional keyword arguments to pass to the mounted page. Defaults to None.
+
+        Returns:
+            (Page): The mounted page instance, or None if its loaders are still running
+        """
+        self._selector_or_element = selector_or_element
+        self._mount_count += 1
+
+        resolved = self._resolve_page(path, page_kwargs)
+        if resolved is None:
+            return None
+        page_class, route, page_kwargs = resolved
+
+        loaders = self.get_loaders(page_class, route)
+        if loaders:
+            coro = self._load_and_mount(selector_or_element, page_class, route, page_kwargs, loaders)
+            if is_server_side and not _in_event_loop():
+                return asyncio.run(coro)
+            create_task(coro)
+            return None
+
+        with self.get_timings().measure("navigation", page_class.__name__):
+            return self._mount_resolved(selector_or_element, page_class, route, page_kwargs)
+
+    async def mount_async(self, selector_or_element, path=None, page_kwargs=None):
+        """
+        Like `mount`, but awaits the page's loaders (if any) before returning.
+
         Args:
             selector_or_element: The selector or element on which to mount the page.
             path: Optional path to match against the router. Defaults to None.
@@ -205,14 +310,34 @@ class Application(Stateful):
         Returns:
             (Page): The mounted page instance
         """
+        self._selector_or_element = selector_or_element
+        self._mount_count += 1
+
+        resolved = self._resolve_page(path, page_kwargs)
+        if resolved is None:
+            return None
+        page_class, route, page_kwargs = resolved
+
+        loaders = self.get_loaders(page_class, route)
+        if loaders:
+            return await self._load_and_mount(selector_or_element, page_class, route, page_kwargs, loaders)
+        with self.get_timings().measure("navigation", page_class.__name__):
+            return self._mount_resolved(selector_or_element, page_class, route, page_kwargs)
+
+    def get_timings(self):
+        """
+        Returns `self.timings` if instrumentation is enabled, or a stand-in that measures nothing.
+        """
+        return self.timings or no_timings
+
+    def _resolve_page(self, path, page_kwargs):
         if page_kwargs is None:
             page_kwargs = {}
 
-        self._selector_or_element = selector_or_element
-
         if self.router:
             path = path or self.current_path
-            route, arguments = self.router.match(path)
+            with self.get_timings().measure("route_match", path):
+                route, arguments = self.router.match(path)
             if arguments:
                 page_kwargs.update(arguments)
 
@@ -229,7 +354,9 @@ class Application(Stateful):
             page_class = self.default_page
         else:
             return None
+        return page_class, route, page_kwargs
 
+    def _mount_resolved(self, selector_or_element, page_class, route, page_kwargs, loaded_props=None):
         self.active_page = None
         try:
             self.mount_page(
@@ -238,11 +365,101 @@ class Application(Stateful):
                 route=route,
                 page_kwargs=page_kwargs,
                 handle_exceptions=True,
+                loaded_props=loaded_props,
             )
         except Exception as e:
             self.handle_error(e)
         return self.active_page
 
+    async def _load_and_mount(self, selector_or_element, page_class, route, page_kwargs, loaders):
+        mount_count = self._mount_count
+        try:
+            loaded_props = await self.run_loaders(page_class, loaders, page_kwargs)
+        except exceptions.PageError as e:
+            if mount_count == self._mount_count:
+                self.handle_page_error(e)
+            return self.active_page
+        except Exception as e:
+            if mount_count == self._mount_count:
+                self.handle_error(e)
+            return self.active_page
+
+        # If the user navigated elsewhere while we were loading, don't clobber the newer page
+        if mount_count != self._mount_count:
+            return None
+        with self.get_timings().measure("navigation", page_class.__name__):
+            return self._mount_resolved(selector_or_element, page_class, route, page_kwargs, loaded_props)
+
+    def get_loaders(self, page_class, route):
+        """
+        Returns the data loaders to run before mounting a page: those of the page class (and its base classes),
+        updated with those of the route.
+
+        Args:
+            page_class (class): The page class being mounted.
+            route (Route): The matched route, if any.
+
+        Returns:
+            (dict): Loaders keyed by prop name
+
+        Raises:
+            PropsError: If a loader's name isn't one of the page's props.
+        """
+        loaders = page_class.get_loaders() if hasattr(page_class, "get_loaders") else {}
+        if route is not None and route.loaders:
+            loaders.update(route.loaders)
+
+        if loaders:
+            props = page_class.get_props()
+            for name in loaders:
+                if name not in props:
+                    raise exceptions.PropsError(f"Loader {name} is not a prop of {page_class.__name__}")
+        return loaders
+
+    async def run_loaders(self, page_class, loaders, arguments):
+        """
+        Runs a page's loaders concurrently, using cached results where `page_class.loader_ttl` allows.
+
+        Args:
+            page_class (class): The page class being mounted.
+            loaders (dict): Loaders keyed by prop name.
+            arguments (dict): Route and query arguments, passed to each loader as keyword arguments.
+
+        Returns:
+            (dict): Loader results keyed by prop name
+        """
+        ttl = page_class.loader_ttl
+        now = time.time()
+
+        for key in [key for key, (expires, _) in self._loader_cache.items() if expires <= now]:
+            del self._loader_cache[key]
+
+        results = {}
+        pending = {}
+        for name, loader in loaders.items():
+            cache_key = self._loader_cache_key(loader, arguments) if ttl else None
+            if cache_key is not None and cache_key in self._loader_cache:
+                results[name] = self._loader_cache[cache_key][1]
+            else:
+                pending[name] = cache_key
+
+        if pending:
+            values = await asyncio.gather(*[loaders[name](self, **arguments) for name in pending])
+            for (name, cache_key), value in zip(pending.items(), values):
+                results[name] = value
+                if cache_key is not None:
+                    self._loader_cache[cache_key] = (now + ttl, value)
+        return results
+
+    @staticmethod
+    def _loader_cache_key(loader, arguments):
+        try:
+            key = (loader, tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in arguments.items())))
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
     @property
     def current_path(self):
         """
@@ -258,7 +475,9 @@ class Application(Stateful):
         else:
             return ""
 
-    def mount_page(self, selector_or_element, page_class, route, page_kwargs, handle_exceptions=True):
+    def mount_page(
+        self, selector_or_element, page_class, route, page_kwargs, handle_exceptions=True, loaded_props=None
+    ):
         """
         Mounts a page on the specified selector or element with the given parameters.
 
@@ -269,27 +488,36 @@ class Application(Stateful):
             page_kwargs (dict): Additional keyword arguments to pass to the page class.
             handle_exceptions (bool, optional): Determines whether to handle exceptions thrown during mounting.
                 Defaults to True.
+            loaded_props (dict, optional): Props produced by the page's loaders, passed to the page as they are.
         """
-        page_class._expanded_props()
-
-        # For security, we only pass props to the page that are defined in the page's props
-        #
-        # We also handle the list or not-list props for multiple or single values
-        # (eg, ?foo=1&foo=2 -> ["1", "2"] if needed)
-        #
-        prop_args = {}
-        prop: Prop
-        for prop in page_class.props_expanded.values():
-            if prop.name in page_kwargs:
-                value = page_kwargs.pop(prop.name)
-                if prop.type is list:
-                    prop_args[prop.name] = value if isinstance(value, list) else [value]
-                else:
-                    prop_args[prop.name] = value if not isinstance(value, list) else value[0]
+        with self.get_timings().measure("prop_coercion", page_class.__name__):
+            # For security, we only pass props to the page that are defined in the page's props
+            #
+            # Values from the URL are converted to each prop's type, including the list or not-list props for multiple
+            # or single values (eg, ?foo=1&foo=2 -> ["1", "2"] if needed)
+            #
+            prop_args = {}
+            prop: Prop
+            try:
+                for prop in page_class.get_props().values():
+                    if prop.name in page_kwargs:
+                        prop_args[prop.name] = prop.coerce(page_kwargs.pop(prop.name))
+            except ValueError:
+                # A URL that doesn't fit the page's props (eg, /users/abc for an int user_id) isn't a page we have
+                error = exceptions.NotFound()
+                if handle_exceptions:
+                    self.handle_page_error(error)
+                    return
+                raise error
+            if loaded_props:
+                prop_args.update(loaded_props)
 
         self.active_page: Page = page_class(matched_route=route, application=self, extra_args=page_kwargs, **prop_args)
+
+        # Patch the new page over the last one we mounted (if it's still there) rather than rebuilding it from scratch
+        replacing, self._mounted_page = self._mounted_page, self.active_page
         try:
-            self.active_page.mount(selector_or_element)
+            self.active_page.mount(selector_or_element, replacing=replacing)
         except exceptions.PageError as e:
             if handle_exceptions:
                 self.handle_page_error(e)
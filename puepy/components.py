@@ -0,0 +1,509 @@
+"""
+Built-in components that aren't needed by every application. Register them with the builder to use them:
+
+``` py
+from puepy import t, components
+
+t.add_library(components)
+```
+
+Classes:
+    VirtualList: A scrolling list that only renders the rows that are in view
+    VirtualTable: A scrolling table that only renders the rows that are in view
+    Lazy: Renders its content only once it scrolls into view
+    AsyncComponent: A base class for components that load their data asynchronously, drawing a fallback meanwhile
+    RequestCache: Shares in-flight (and, optionally, recent) async requests between callers asking for the same thing
+
+Attributes:
+    request_cache (RequestCache): The shared request cache
+"""
+
+import asyncio
+import time
+
+from .core import Component, Prop, t
+from .exceptions import ElementNotInDom
+from .runtime import create_proxy, create_task, is_server_side
+from .util import jsobj
+
+
+class VirtualList(Component):
+    """
+    A scrolling list that only renders the rows in view, plus a few either side (the overscan), however many rows
+    there are. As the list scrolls, the rendered rows are reused for the rows scrolling into view, so their Tags and
+    DOM nodes are recycled rather than recreated.
+
+    Rows are drawn by the `populate_row` callback, which is called with a row's index inside the list's populate, and
+    should create one tag per row of about `row_height` pixels. Let rows have automatic refs (rather than passing
+    `ref=`), so they are recycled by position.
+
+    Examples:
+        ``` py
+        t.virtual_list(
+            row_count=len(self.state["items"]),
+            row_height=32,
+            populate_row=lambda index: t.div(self.state["items"][index]["name"]),
+        )
+        ```
+    """
+
+    enclosing_tag = "div"
+    redraw_on_app_state_changes = False
+
+    props = [
+        Prop("row_count", "How many rows there are", int, 0),
+        Prop("row_height", "The height of each row, in pixels", int, 24),
+        Prop("populate_row", "Called with a row's index to draw that row", default_value=None),
+        Prop("height", "The height of the scrolling area, in pixels", int, 400),
+        Prop("overscan", "How many rows to render beyond the visible ones, above and below", int, 5),
+    ]
+
+    styles = {
+        "&": {"overflow_y": "auto", "position": "relative"},
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._manually_added_event_listeners = {"scroll": self.on_scroll}
+
+    def initial(self):
+        return {"first_row": 0}
+
+    def visible_range(self):
+        """
+        Returns the range of rows to render: those in view, plus the overscan.
+
+        Returns:
+            (tuple): The index of the first row to render, and the index after the last
+        """
+        row_height = max(self.row_height, 1)
+        per_view = -(-self.height // row_height)  # Rounded up
+
+        # Near the end, keep the overscan above the last page of rows
+        first = min(self.state["first_row"], max(self.row_count - per_view - self.overscan, 0))
+        last = min(first + per_view + self.overscan * 2, self.row_count)
+        return first, last
+
+    def on_scroll(self, event):
+        first = max(int(event.target.scrollTop // max(self.row_height, 1)) - self.overscan, 0)
+        if first != self.state["first_row"]:
+            self.state["first_row"] = first
+
+    def get_default_attrs(self):
+        attrs = super().get_default_attrs()
+        attrs["style"] = f"height: {self.height}px"
+        return attrs
+
+    def populate(self):
+        first, last = self.visible_range()
+        # The spacer is as tall as all the rows together, so the list scrolls as if they were all rendered, and the
+        # rendered rows are moved down to where they'd be
+        with t.div(ref="spacer", style=f"height: {self.row_count * self.row_height}px"):
+            with t.div(ref="rows", style=f"transform: translateY({first * self.row_height}px)"):
+                self.populate_rows(first, last)
+
+    def populate_rows(self, first, last):
+        if self.populate_row:
+            for index in range(first, last):
+                self.populate_row(index)
+
+
+class VirtualTable(VirtualList):
+    """
+    A scrolling table that only renders the rows in view, like `VirtualList`. The `populate_row` callback should create
+    a `tr` for each row, and the optional `populate_header` callback may create the table's header rows.
+
+    Examples:
+        ``` py
+        t.virtual_table(
+            row_count=len(rows),
+            row_height=28,
+            populate_header=lambda: t.tr(t.th("Name"), t.th("Email")),
+            populate_row=lambda index: self.draw_row(rows[index]),
+        )
+        ```
+    """
+
+    props = VirtualList.props + [
+        Prop("populate_header", "Called to draw the table's header rows", default_value=None),
+    ]
+
+    styles = {
+        "&": {"overflow_y": "auto", "position": "relative"},
+        "table": {"width": "100%", "border_collapse": "collapse"},
+    }
+
+    def populate(self):
+        first, last = self.visible_range()
+        with t.table(ref="table"):
+            if self.populate_header:
+                with t.thead(ref="head"):
+                    self.populate_header()
+            with t.tbody(ref="body"):
+                # Spacer rows stand in for the rows that aren't rendered, so the table scrolls as if they were
+                t.tr(ref="before", style=f"height: {first * self.row_height}px")
+                self.populate_rows(first, last)
+                t.tr(ref="after", style=f"height: {(self.row_count - last) * self.row_height}px")
+
+
+class _IntersectionWatcher:
+    # One IntersectionObserver per root margin, shared by every Lazy component using that margin
+
+    def __init__(self, root_margin):
+        from js import IntersectionObserver
+
+        self.root_margin = root_margin
+        self.components = {}
+        self._proxy = create_proxy(self._on_entries)
+        self.observer = IntersectionObserver.new(self._proxy, jsobj(rootMargin=root_margin))
+
+    def observe(self, component, element):
+        self.components[component.element_id] = component
+        self.observer.observe(element)
+
+    def unobserve(self, component, element):
+        self.components.pop(component.element_id, None)
+        self.observer.unobserve(element)
+
+    def _on_entries(self, entries, observer=None):
+        for entry in entries:
+            component = self.components.get(entry.target.id)
+            if component:
+                component.on_intersection(self.root_margin, entry.isIntersecting)
+
+
+_watchers = {}
+
+
+def _get_watcher(root_margin):
+    if root_margin not in _watchers:
+        _watchers[root_margin] = _IntersectionWatcher(root_margin)
+    return _watchers[root_margin]
+
+
+class Lazy(Component):
+    """
+    Renders a placeholder until it comes near the viewport, and only then populates and renders its content. Long
+    pages of feed items, comments, charts, etc, mount much faster when most of their content starts out as
+    placeholders.
+
+    The content is drawn by the `populate_content` callback, so that nothing is populated until it's needed. If
+    `unload_margin` is given, the content is also replaced by the placeholder again when it goes that far out of view,
+    to keep the page light as the user scrolls through a long feed.
+
+    Examples:
+        ``` py
+        for post in self.state["posts"]:
+            t.lazy(placeholder_height=240, populate_content=lambda post=post: t.post_card(post=post))
+        ```
+    """
+
+    enclosing_tag = "div"
+    redraw_on_app_state_changes = False
+
+    props = [
+        Prop("populate_content", "Called to draw the content once it's near the viewport", default_value=None),
+        Prop("placeholder_height", "The height of the placeholder, in pixels", int, 100),
+        Prop("root_margin", "How near the viewport the content is loaded, as a CSS margin", str, "200px"),
+        Prop("unload_margin", "How far out of view the content is unloaded (a CSS margin), if at all", default_value=None),
+    ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._observed_element = None
+        self._load_watcher = None
+        self._unload_watcher = None
+
+    def initial(self):
+        return {"loaded": False}
+
+    def populate(self):
+        if self.state["loaded"]:
+            if self.populate_content:
+                self.populate_content()
+        else:
+            t.div(ref="placeholder", style=f"height: {self.placeholder_height}px")
+
+    def on_intersection(self, root_margin, is_intersecting):
+        """
+        Called by the IntersectionObserver when the component comes into (or goes out of) range.
+
+        Args:
+            root_margin (str): The margin whose intersection changed, either `root_margin` or `unload_margin`.
+            is_intersecting (bool): Whether the component is now within the margin.
+        """
+        if root_margin == self.root_margin and is_intersecting:
+            self.state["loaded"] = True
+        elif root_margin == self.unload_margin and not is_intersecting:
+            self.state["loaded"] = False
+
+    def _attach_event_listeners(self, rendered=False, kept=False):
+        super()._attach_event_listeners(rendered, kept)
+        if is_server_side:
+            return
+
+        # Like event listeners, the observers follow the live element, which may have been replaced
+        try:
+            element = self.element
+        except ElementNotInDom:
+            element = None
+
+        if self._observed_element is not None and (element is None or not self._observed_element == element):
+            self._unobserve()
+        if element is not None and self._observed_element is None:
+            self._observe(element)
+
+    def _observe(self, element):
+        self._observed_element = element
+        self._load_watcher = _get_watcher(self.root_margin)
+        self._load_watcher.observe(self, element)
+        if self.unload_margin:
+            self._unload_watcher = _get_watcher(self.unload_margin)
+            self._unload_watcher.observe(self, element)
+
+    def _unobserve(self):
+        for watcher in (self._load_watcher, self._unload_watcher):
+            if watcher:
+                watcher.unobserve(self, self._observed_element)
+        self._observed_element = self._load_watcher = self._unload_watcher = None
+
+    def _unmount(self):
+        if self._observed_element is not None:
+            self._unobserve()
+        super()._unmount()
+
+
+_pending = object()
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = asyncio.Event()
+        self.value = _pending
+        self.error = None
+
+
+class RequestCache:
+    """
+    Shares async requests between callers. While a request is in flight, anyone else making the same request (the
+    same function with the same arguments) waits for it rather than making it again, so a dozen components asking for
+    the same user make one request between them. With a `ttl`, results are also kept for that many seconds afterwards.
+
+    Attributes:
+        ttl (float): How long to keep results once a request completes, in seconds. 0 keeps nothing beyond the
+            in-flight request.
+        max_size (int): The most results to keep. Expired results are discarded whenever a result is kept, and if
+            that still leaves the cache full, all kept results are discarded.
+
+    Examples:
+        ``` py
+        user = await request_cache.request(fetch_user, user_id)
+        ```
+    """
+
+    def __init__(self, ttl=0, max_size=256):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._results = {}
+        self._in_flight = {}
+
+    async def request(self, func, *args, **kwargs):
+        """
+        Awaits `func(*args, **kwargs)`, sharing the result with identical requests. Requests with unhashable arguments
+        aren't shared.
+
+        Args:
+            func (callable): An async function.
+            *args: Positional arguments for `func`.
+            **kwargs: Keyword arguments for `func`.
+
+        Returns:
+            The function's result
+        """
+        key = self._key(func, args, kwargs)
+        if key is None:
+            return await func(*args, **kwargs)
+
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > time.time():
+                return cached[1]
+            del self._results[key]
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            await in_flight.event.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            if in_flight.value is _pending:
+                # The request was cancelled rather than completing, so make it afresh
+                return await self.request(func, *args, **kwargs)
+            return in_flight.value
+
+        in_flight = self._in_flight[key] = _InFlight()
+        try:
+            in_flight.value = await func(*args, **kwargs)
+        except Exception as e:
+            in_flight.error = e
+            raise
+        finally:
+            del self._in_flight[key]
+            in_flight.event.set()
+
+        if self.ttl:
+            self._keep(key, in_flight.value)
+        return in_flight.value
+
+    def _keep(self, key, value):
+        now = time.time()
+        for expired in [cached for cached, (expires, _) in self._results.items() if expires <= now]:
+            del self._results[expired]
+        if len(self._results) >= self.max_size:
+            self._results.clear()
+        self._results[key] = (now + self.ttl, value)
+
+    def invalidate(self, func=None, *args, **kwargs):
+        """
+        Discards kept results, so they're requested again next time. Requests already in flight are unaffected.
+
+        Args:
+            func (callable, optional): The function whose result to discard, along with its arguments. If not
+                passed, all results are discarded.
+        """
+        if func is None:
+            self._results.clear()
+        else:
+            self._results.pop(self._key(func, args, kwargs), None)
+
+    @staticmethod
+    def _key(func, args, kwargs):
+        try:
+            key = (func, args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+
+request_cache = RequestCache()
+
+
+class AsyncComponent(Component):
+    """
+    A base class for components whose data is loaded asynchronously. Define `async def load(self)` to fetch the data,
+    `populate_fallback` to draw something while it's loading, and `populate` to draw the data, found in
+    `self.state["data"]`. When the load completes, its result is put in the component's state, which redraws it.
+
+    The data is loaded when the component is first drawn, and loaded again whenever `load_key()` changes, which by
+    default is whenever a prop (other than a callback) changes. If `load` raises, `populate_error` is drawn instead.
+    Use `request_cache` in `load` to share requests between components asking for the same thing.
+
+    Examples:
+        ``` py
+        class UserCard(AsyncComponent):
+            props = ["user_id"]
+
+            async def load(self):
+                return await request_cache.request(fetch_user, self.user_id)
+
+            def populate_fallback(self):
+                t.div("Loading...", classes="skeleton")
+
+            def populate(self):
+                t.div(self.state["data"]["name"])
+        ```
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._load_key = _pending
+        self._load_generation = 0
+        self.loading = False
+        super().__init__(*args, **kwargs)
+
+    def initial(self):
+        return {"data": None, "error": None}
+
+    async def load(self):
+        """
+        To be overridden in subclasses, loads the component's data.
+
+        Returns:
+            The data, which is stored as `self.state["data"]`
+        """
+        return None
+
+    def load_key(self):
+        """
+        Returns what the loaded data depends on. When it changes, the data is loaded again. By default, this is the
+        component's prop values, ignoring callables (which are often recreated on every redraw).
+
+        Returns:
+            The value to compare with the last load's
+        """
+        return {name: value for name, value in self.props_values.items() if not callable(value)}
+
+    def populate_fallback(self):
+        """
+        To be overridden in subclasses, draws the component while its data is loading. Draws nothing by default.
+        """
+        pass
+
+    def populate_error(self, error):
+        """
+        Draws the component when `load` raised an exception. By default, the exception is raised again, to be handled
+        like any error raised while drawing.
+
+        Args:
+            error (Exception): The exception `load` raised.
+        """
+        raise error
+
+    def generate_children(self, timings=None):
+        load_key = self.load_key()
+        if load_key != self._load_key:
+            self._start_load(load_key)
+        super().generate_children(timings)
+
+    def _populate(self):
+        if self.loading:
+            self.populate_fallback()
+        elif self.state["error"] is not None:
+            self.populate_error(self.state["error"])
+        else:
+            self.populate()
+
+    def _start_load(self, load_key):
+        self._load_key = load_key
+        self._load_generation += 1
+        self.loading = True
+
+        if is_server_side:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # Nothing would run the load, so the fallback is all that's drawn
+                return
+        create_task(self._run_load(self._load_generation))
+
+    async def _run_load(self, generation):
+        try:
+            data, error = await self.load(), None
+        except Exception as e:
+            data, error = None, e
+
+        if generation != self._load_generation:
+            # Props changed and a newer load was started, or the component is no longer drawn
+            return
+
+        self.loading = False
+        # Notify even if the data hasn't changed, since the component still needs to be redrawn without its fallback
+        with self.state.mutate("data", "error"):
+            self.state["data"] = data
+            self.state["error"] = error
+
+    def _unmount(self):
+        self._load_generation += 1
+        super()._unmount()
+
+
+components = [VirtualList, VirtualTable, Lazy]
@@ -1,5 +1,6 @@
 from .exceptions import ElementNotInDom, PropsError, PageError
 from .reactivity import ReactiveDict, Stateful
+from .timing import no_timings
 from .runtime import (
     add_event_listener,
     remove_event_listener,
@@ -14,10 +15,27 @@ from .util import (
     merge_classes,
     _extract_event_handlers,
     patch_dom_element,
+    patch_keeps_elements,
+    stable_hash,
+    import_object,
 )
 
 
+def _css_declarations(rules):
+    if isinstance(rules, str):
+        return rules
+    elif isinstance(rules, dict):
+        return ";".join(f"{k.replace('_', '-')}: {v}" for k, v in rules.items())
+    else:
+        return ";".join(rules)
+
+
 class CssClass:
+    """
+    A CSS class defined in Python. The class name is derived from the rules, so CssClass instances with identical rules
+    share a class name and are only added to the document once.
+    """
+
     def __init__(self, *rules, **kw_rules):
         self.rules = list(rules)
 
@@ -25,14 +43,233 @@ class CssClass:
             k = k.replace("_", "-")
             self.rules.append(f"{k}: {v}")
 
-        self.class_name = f"-ps-{id(self)}"
+        self.class_name = f"-ps-{stable_hash(';'.join(self.rules)):x}"
 
     def __str__(self):
         return self.class_name
 
+    def __eq__(self, other):
+        return isinstance(other, CssClass) and other.class_name == self.class_name
+
+    def __hash__(self):
+        return hash(self.class_name)
+
     def render_css(self):
         return f".{self.class_name} {{ {';'.join(self.rules)} }}"
 
+    def render_rules(self):
+        return [self.render_css()]
+
+
+def _split_selectors(selector):
+    # Splits a selector list at its top level commas only, leaving eg ":is(h1, h2)" or "[title='a, b']" whole
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    for i, char in enumerate(selector):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(selector[start:i])
+            start = i + 1
+    parts.append(selector[start:])
+    return parts
+
+
+class ScopedStyles:
+    """
+    A component class's `styles`, compiled into rules scoped to a class name that is added to the component's root
+    element.
+
+    Selectors are scoped to descendants of the component's root element, except that "&" stands for the root element
+    itself, so "&" or "" styles the root, "&:hover" the hovered root, and ".title" any element with the title class
+    within the component. Rules may be a string, a list of declarations, or a dict, where underscores in property names
+    are replaced with dashes, like CssClass.
+
+    Attributes:
+        class_name (str): The scope's class name, derived from the component class's name and rules.
+        rules (list): The compiled CSS rules.
+    """
+
+    def __init__(self, name, styles):
+        compiled = [(selector, _css_declarations(rules)) for selector, rules in styles.items()]
+        source = "\n".join(f"{selector} {{ {rules} }}" for selector, rules in compiled)
+
+        self.class_name = f"-ps-{mixed_to_underscores(name, '-')}-{stable_hash(source):x}"
+        self.rules = [f"{self.scope_selector(selector)} {{ {rules} }}" for selector, rules in compiled]
+
+    def scope_selector(self, selector):
+        """
+        Scopes a selector (or a comma separated list of selectors) to this scope's class name.
+
+        Args:
+            selector (str): The selector, eg ".title", "&:hover" or "h1, h2".
+
+        Returns:
+            (str): The scoped selector, eg ".-ps-card-1a2b .title"
+        """
+        scope = f".{self.class_name}"
+        scoped = []
+        for part in _split_selectors(selector):
+            part = part.strip()
+            if not part:
+                scoped.append(scope)
+            elif "&" in part:
+                scoped.append(part.replace("&", scope))
+            else:
+                scoped.append(f"{scope} {part}")
+        return ", ".join(scoped)
+
+    def __str__(self):
+        return self.class_name
+
+    def render_css(self):
+        return "\n".join(self.rules)
+
+    def render_rules(self):
+        return self.rules
+
+
+class CssRegistry:
+    """
+    Keeps track of which CssClass and ScopedStyles rules have been added to the document's runtime stylesheet, so each
+    is only added once. New rules are inserted with `CSSStyleSheet.insertRule` rather than by rewriting the
+    stylesheet's text, so the browser doesn't have to reparse rules it already has. If the stylesheet goes missing, eg
+    because the document was replaced, everything added so far is added again when a page is next mounted.
+
+    Attributes:
+        element_id (str): The id of the `<style>` element rules are added to.
+        class_names (set): The class names whose rules are in the stylesheet.
+    """
+
+    element_id = "puepy-runtime-css"
+
+    def __init__(self):
+        self.class_names = set()
+        self.token = f"{id(self)}"
+        self._rules = {}
+
+    def add(self, document, css_classes):
+        """
+        Adds the rules for any of the given CssClass (or ScopedStyles) instances that aren't already in the document.
+        Classes already added are skipped without touching the document.
+
+        Args:
+            document: The document to add the rules to.
+            css_classes: An iterable of CssClass instances.
+        """
+        if getattr(document, "head", None) is None:
+            # Not a full HTML document (eg, rendering server side), so there's nowhere to put styles
+            return
+
+        new_rules = {}
+        for css_class in css_classes:
+            if css_class.class_name not in self.class_names:
+                new_rules[css_class.class_name] = css_class.render_rules()
+        if not new_rules:
+            return
+
+        el = document.getElementById(self.element_id)
+        if not self._is_own_element(el):
+            # The style element is new, or isn't the one we've been adding to, so nothing is known to be in it
+            self.class_names = set()
+            new_rules = dict(self._rules, **new_rules)
+        self._insert(document, el, new_rules)
+
+    def check(self, document):
+        """
+        Adds everything added so far again if the style element has gone missing or been replaced. Called once per
+        mount, so that rendering doesn't have to look for the style element.
+
+        Args:
+            document: The document the rules were added to.
+        """
+        if getattr(document, "head", None) is None or not self._rules:
+            return
+
+        el = document.getElementById(self.element_id)
+        if not self._is_own_element(el):
+            self.class_names = set()
+            self._insert(document, el, dict(self._rules))
+
+    def _is_own_element(self, el):
+        return bool(el) and el.getAttribute("data-puepy-css") == self.token
+
+    def _insert(self, document, el, new_rules):
+        self._rules.update(new_rules)
+        self.class_names.update(new_rules)
+        css_rules = [rule for rules in new_rules.values() for rule in rules]
+        if not el:
+            el = document.createElement("style")
+            el.type = "text/css"
+            el.setAttribute("id", self.element_id)
+            if is_server_side:
+                el.setIdAttribute("id")
+            el.setAttribute("data-puepy-css", self.token)
+            el.appendChild(document.createTextNode("\n".join(css_rules)))
+            document.head.appendChild(el)
+        else:
+            el.setAttribute("data-puepy-css", self.token)
+            sheet = getattr(el, "sheet", None)
+            if sheet:
+                for rule in css_rules:
+                    try:
+                        sheet.insertRule(rule, sheet.cssRules.length)
+                    except Exception:
+                        # Invalid rules are ignored, as they would be in a stylesheet's text
+                        pass
+            else:
+                el.appendChild(document.createTextNode("\n".join(css_rules)))
+
+
+css_registry = CssRegistry()
+
+
+STATIC_TEMPLATES_CACHE_SIZE = 256
+_static_templates = {}
+
+
+def _store_static_template(key, template):
+    # Bounded like merge_classes' cache: when it's full, start again rather than growing without limit
+    if key not in _static_templates and len(_static_templates) >= STATIC_TEMPLATES_CACHE_SIZE:
+        _static_templates.clear()
+    _static_templates[key] = template
+
+
+def _remove_ids(element):
+    if is_server_side:
+        if element.nodeType == 1 and element.hasAttribute("id"):
+            element.removeAttribute("id")
+        for child in element.childNodes:
+            _remove_ids(child)
+    else:
+        for child in element.querySelectorAll("[id]"):
+            child.removeAttribute("id")
+
+
+def _descendant_tags(tag):
+    for child in tag.children:
+        if isinstance(child, Tag):
+            yield child
+            for descendant in _descendant_tags(child):
+                yield descendant
+
+
+def _stamp_static_template(element, template):
+    if is_server_side:
+        for child in template.childNodes:
+            element.appendChild(child.cloneNode(True))
+    else:
+        element.appendChild(template.content.cloneNode(True))
+
 
 class Prop:
     """
@@ -51,6 +288,46 @@ class Prop:
         self.type = type
         self.default_value = default_value
 
+    def coerce(self, value):
+        """
+        Converts a value from a URL (a string, or a list of strings when a query argument is repeated) to the prop's
+        type. Values that aren't strings are returned as they are, so it's safe to pass values that are already typed.
+
+        Args:
+            value: The value to convert.
+
+        Returns:
+            The converted value
+
+        Raises:
+            ValueError: If the string can't be converted to the prop's type.
+        """
+        if self.type is list:
+            return value if isinstance(value, list) else [value]
+        if isinstance(value, list):
+            value = value[0]
+        if isinstance(value, str) and self.type in _string_coercions:
+            return _string_coercions[self.type](value)
+        return value
+
+
+def _coerce_bool(value):
+    return value.strip().lower() not in ("", "0", "false", "no", "off")
+
+
+_string_coercions = {int: int, float: float, bool: _coerce_bool}
+
+
+def _element_is_live(element, element_id):
+    if element.getAttribute("id") != element_id:
+        return False
+    if is_server_side:
+        node = element
+        while node.parentNode is not None:
+            node = node.parentNode
+        return node.nodeType == node.DOCUMENT_NODE
+    return element.isConnected
+
 
 def _element_input_type(element):
     try:
@@ -66,7 +343,8 @@ class Tag:
     `Component`, which is then the base class of `Page`.
 
     Attributes:
-        default_classes (list): Default classes for the tag.
+        default_classes (list): Default classes for the tag. Treated as a constant; assign a new list rather than
+            modifying it in place.
         default_attrs (dict): Default attributes for the tag.
         default_role (str): Default role for the tag.
         page (Page): The page the tag is on.
@@ -90,6 +368,37 @@ class Tag:
 
     document = document
 
+    # Plain tags are by far the most numerous objects on a page, so their attributes are kept in slots rather than a
+    # per-instance dict (which is only created if something else is set on them). Subclasses, including components,
+    # keep a dict as usual.
+    __slots__ = (
+        "__dict__",
+        "__weakref__",
+        "_added_event_listeners",
+        "_pending_event_listeners",
+        "_manually_added_event_listeners",
+        "_kwarg_event_listeners",
+        "_rendered_element",
+        "_element",
+        "_element_verified",
+        "_element_id",
+        "_auto_ref_ids",
+        "_next_auto_ref_id",
+        "_refs_pending_removal",
+        "_retained_attrs",
+        "_children_generated",
+        "_page",
+        "_parent",
+        "children",
+        "refs",
+        "tag_name",
+        "ref",
+        "parent_component",
+        "origin",
+        "attrs",
+        "bind",
+    )
+
     # noinspection t
     def __init__(
         self,
@@ -102,30 +411,45 @@ class Tag:
         children=None,
         **kwargs,
     ):
+        # Containers most tags never need are None until they're first used, so plain tags stay small
+
         # Kept so we can garbage collect them later
-        self._added_event_listeners = []
+        self._added_event_listeners = None
+
+        # Requested by the latest render, but not yet added to the live element
+        self._pending_event_listeners = None
 
         # Ones manually added, which we persist when reconfigured
-        self._manually_added_event_listeners = {}
+        self._manually_added_event_listeners = None
 
         # The rendered element
         self._rendered_element = None
 
+        # The live element in the document, once looked up (see the element property), and whether it's known to
+        # still be the live one
+        self._element = None
+        self._element_verified = False
+
         # Child nodes and origin refs
         self.children = []
         self.refs = {}
 
+        # Short ids for the parents of auto-ref'd tags this tag populates: {parent ref: id}
+        self._auto_ref_ids = None
+        self._next_auto_ref_id = 0
+
         self.tag_name = tag_name
         self.ref = ref
 
         # Attrs that webcomponents create that we need to preserve
-        self._retained_attrs = {}
+        self._retained_attrs = None
 
         # Add any children passed to constructor
         if children:
             self.add(*children)
 
         # Configure self._page
+        self._parent = None
         if isinstance(page, Page):
             self._page = page
         elif isinstance(self, Page):
@@ -135,13 +459,6 @@ class Tag:
         else:
             raise Exception("No page passed")
 
-        if "id" in kwargs:
-            self._element_id = kwargs["id"]
-        elif self._page and self._page.application:
-            self._element_id = self._page.application.element_id_generator.get_id_for_element(self)
-        else:
-            self._element_id = f"ppauto-{id(self)}"
-
         if isinstance(parent, Tag):
             self.parent = parent
             parent.add(self)
@@ -157,15 +474,76 @@ class Tag:
         else:
             self.parent_component = None
 
+        # Generated once the parent is known, since id generators may derive the id from it
+        if "id" in kwargs:
+            self._element_id = kwargs["id"]
+        elif self._page and self._page.application:
+            self._element_id = self._page.application.element_id_generator.get_id_for_element(self)
+        else:
+            self._element_id = f"ppauto-{id(self)}"
+
         self.origin = origin
         self._children_generated = False
 
         self._configure(kwargs)
 
     def __del__(self):
-        if not is_server_side:
-            while self._added_event_listeners:
-                remove_event_listener(*self._added_event_listeners.pop())
+        self._remove_event_listeners()
+
+    def _remove_event_listeners(self):
+        while self._added_event_listeners:
+            element, event, listener = self._added_event_listeners.pop()
+            if element is None:
+                self._page._undelegate_event_listener(self.element_id, event, listener)
+            elif not is_server_side:
+                remove_event_listener(element, event, listener)
+
+    def _attach_event_listeners(self, rendered=False, kept=False):
+        """
+        Once the tag's rendering is in the document, makes the listeners on its live element match those requested by
+        the latest render. Listeners that are still wanted are left alone, stale ones are removed (which releases their
+        proxies) and new ones are added.
+
+        Args:
+            rendered (bool): If True, the element from the latest render is known to be the one in the document, so it
+                doesn't need looking up.
+            kept (bool): If True, the rendering was patched in by a patch that keeps existing elements in place (see
+                `patch_keeps_elements`), so an element cached before the patch is still the live one.
+        """
+        pending = self._pending_event_listeners or ()
+        self._pending_event_listeners = None
+
+        self._update_cached_element(rendered, kept)
+
+        if self._page.delegate_events or not (pending or self._added_event_listeners):
+            # Nothing to add or remove, so there's no need to find the live element
+            return
+
+        try:
+            element = self.element
+        except ElementNotInDom:
+            element = None
+
+        current = self._added_event_listeners or ()
+        self._added_event_listeners = None
+        if element is None:
+            for entry in current:
+                if not is_server_side:
+                    remove_event_listener(*entry)
+            return
+
+        # Everything in current was added to the same element, the one that was live after the last render
+        same_element = bool(current) and current[0][0] == element
+        for entry in current:
+            old_element, event, listener = entry
+            if same_element and (event, listener) in pending:
+                pending.remove((event, listener))
+                self._keep_event_listener(entry)
+            elif not is_server_side:
+                remove_event_listener(old_element, event, listener)
+
+        for event, listener in pending:
+            self.add_event_listener(element, event, listener)
 
     @property
     def application(self):
@@ -189,7 +567,7 @@ class Tag:
             self.bind = None
 
     def _handle_attrs(self, kwargs):
-        self.attrs = self._retained_attrs.copy()
+        self.attrs = self._retained_attrs.copy() if self._retained_attrs else {}
         for k, v in kwargs.items():
             if hasattr(self, f"set_{k}"):
                 getattr(self, f"set_{k}")(v)
@@ -214,24 +592,54 @@ class Tag:
         """
         pass
 
-    def generate_children(self):
+    def generate_children(self, timings=None):
         """
         Runs populate, but first adds self to self.population_stack, and removes it after populate runs.
 
         That way, as populate is executed, self.population_stack can be used to figure out what the innermost populate()
         method is being run and thus, where to send bind= parameters.
+
+        Args:
+            timings (Timings, optional): If passed, precheck and populate are timed.
         """
         self.origin_stack.append([])
         self._refs_pending_removal = self.refs.copy()
         self.refs = {}
         self.population_stack.append(self)
         try:
-            self.precheck()
-            self.populate()
+            if timings:
+                with timings.measure("precheck", self):
+                    self.precheck()
+                with timings.measure("populate", self):
+                    self._populate()
+            else:
+                self.precheck()
+                self._populate()
         finally:
             self.population_stack.pop()
             self.origin_stack.pop()
 
+        self._release_removed_refs()
+
+    def _populate(self):
+        # Tags that sometimes draw something other than their content (eg, while loading) override this
+        self.populate()
+
+    def _release_removed_refs(self):
+        """
+        Unmounts tags that the last populate() didn't recreate, since they're no longer drawn.
+        """
+        for ref, tag in self._refs_pending_removal.items():
+            if ref not in self.refs:
+                if self._auto_ref_ids:
+                    self._auto_ref_ids.pop(ref, None)
+                if isinstance(tag, Component):
+                    tag.recursive_call("_unmount")
+                else:
+                    tag._unmount()
+                    if type(tag) is Tag:
+                        self._page._recycle_tag(tag)
+
     def render(self):
         attrs = self.get_default_attrs()
         attrs.update(self.attrs)
@@ -268,12 +676,50 @@ class Tag:
 
     @property
     def element(self):
+        """
+        The tag's element in the document. After the first lookup, the element is cached. When a redraw might have
+        replaced it, the cached element is checked (rather than looked up again) the next time it's used.
+
+        Raises:
+            ElementNotInDom: If the element isn't in the document.
+        """
+        if self._element is not None and not self._element_verified:
+            if not _element_is_live(self._element, self.element_id):
+                self._element = None
+            self._element_verified = True
+        if self._element is None:
+            self._element = self._find_element()
+        return self._element
+
+    def _update_cached_element(self, rendered, kept):
+        # After a patch, the live element is either the one cached before (if the patch kept it) or the one just
+        # rendered (if the patch moved it into the document)
+        rendered_element = self._rendered_element
+        self._rendered_element = None
+
+        if rendered:
+            self._element = rendered_element
+            self._element_verified = True
+        elif self._element is None:
+            self._element = rendered_element
+            self._element_verified = False
+        elif not kept:
+            self._element_verified = False
+
+    def _find_element(self):
         el = self.document.getElementById(self.element_id)
         if el:
             return el
         else:
             raise ElementNotInDom(self.element_id)
 
+    def _unmount(self):
+        """
+        Called when the tag is no longer drawn, to release its event listeners and cached element.
+        """
+        self._remove_event_listeners()
+        self._element = None
+
     # noinspection t
     def _render_onto(self, element, attrs):
         self._rendered_element = element
@@ -309,8 +755,14 @@ class Tag:
             element.setAttribute("role", self.default_role)
 
         # Add event handlers
-        self._add_listeners(element, self._kwarg_event_listeners)
-        self._add_listeners(element, self._manually_added_event_listeners)
+        if self._page.delegate_events:
+            # Delegated listeners are registered by id rather than on the element, so drop the last render's first
+            Tag._remove_event_listeners(self)
+        self._pending_event_listeners = None
+        if self._kwarg_event_listeners:
+            self._add_listeners(element, self._kwarg_event_listeners)
+        if self._manually_added_event_listeners:
+            self._add_listeners(element, self._manually_added_event_listeners)
 
         # Add bind
         if self.bind and self.origin:
@@ -345,7 +797,7 @@ class Tag:
                     element.value = value
                     element.setAttribute("value", value)
                 event_type = "input"
-            self.add_event_listener(element, event_type, self.on_bind_input)
+            self._add_rendered_event_listener(element, event_type, self.on_bind_input)
         elif self.bind:
             raise Exception("Cannot specify bind a valid parent component")
 
@@ -356,9 +808,19 @@ class Tag:
             key = key.replace("_", "-")
             if isinstance(value, (list, tuple)):
                 for handler in value:
-                    self.add_event_listener(element, key, handler)
+                    self._add_rendered_event_listener(element, key, handler)
             else:
-                self.add_event_listener(element, key, value)
+                self._add_rendered_event_listener(element, key, value)
+
+    def _add_rendered_event_listener(self, element, event, listener):
+        if self._page.delegate_events:
+            self.add_event_listener(element, event, listener)
+        else:
+            # Rendering may be onto a staging element that's only patched into the document, so the listener is added
+            # to whichever element ends up live, by _attach_event_listeners
+            if self._pending_event_listeners is None:
+                self._pending_event_listeners = []
+            self._pending_event_listeners.append((event, listener))
 
     def render_children(self, element):
         for child in self.children:
@@ -386,8 +848,13 @@ class Tag:
         raise Exception(f"Unknown child type {type(child)} onto {self}")
 
     def get_render_classes(self, attrs):
+        if type(self).get_default_classes is Tag.get_default_classes:
+            default_classes = self._get_default_class_set()
+        else:
+            default_classes = set(self.get_default_classes())
+
         class_names, python_css_classes = merge_classes(
-            set(self.get_default_classes()),
+            default_classes,
             attrs.pop("class_name", []),
             attrs.pop("classes", []),
             attrs.pop("class", []),
@@ -406,6 +873,14 @@ class Tag:
         """
         return self.default_classes.copy()
 
+    def _get_default_class_set(self):
+        # default_classes is treated as a constant, so its set is built once per list and shared by every instance
+        cached = getattr(self, "_default_class_set", None)
+        if cached is None or cached[0] is not self.default_classes:
+            cached = (self.default_classes, frozenset(self.default_classes))
+            type(self)._default_class_set = cached
+        return cached[1]
+
     def get_default_attrs(self):
         return self.default_attrs.copy()
 
@@ -416,28 +891,85 @@ class Tag:
 
         Should probably not be used outside this class.
         """
-        self._added_event_listeners.append((element, event, listener))
-        if not is_server_side:
-            add_event_listener(element, event, listener)
+        if self._page.delegate_events:
+            self._keep_event_listener((None, event, listener))
+            self._page._delegate_event_listener(self.element_id, event, listener)
+        else:
+            self._keep_event_listener((element, event, listener))
+            if not is_server_side:
+                add_event_listener(element, event, listener)
 
-    def mount(self, selector_or_element):
-        self.update_title()
-        if not self._children_generated:
-            with self:
-                self.generate_children()
+    def _keep_event_listener(self, entry):
+        if self._added_event_listeners is None:
+            self._added_event_listeners = []
+        self._added_event_listeners.append(entry)
 
-        if isinstance(selector_or_element, str):
-            element = self.document.querySelector(selector_or_element)
-        else:
-            element = selector_or_element
+    def mount(self, selector_or_element, replacing=None):
+        """
+        Renders the tag and mounts it onto the given selector or element.
 
-        if not element:
-            raise RuntimeError(f"Element {selector_or_element} not found")
+        Args:
+            selector_or_element (str or Element): The selector string or element to mount onto.
+            replacing (Tag, optional): A tag previously mounted on the same element, usually the last page. If its
+                element is still the only child, the new rendering is patched into it instead of wiping and rebuilding
+                the element, so markup the two have in common (navbars, sidebars, etc) is kept.
+        """
+        timings = self.get_timings()
+        with timings.measure("mount", self):
+            if replacing is not None:
+                replacing.recursive_call("_unmount")
+
+            self.update_title()
+            if not self._children_generated:
+                with self:
+                    self.generate_children(timings)
+
+            if isinstance(selector_or_element, str):
+                element = self.document.querySelector(selector_or_element)
+            else:
+                element = selector_or_element
 
-        element.innerHTML = ""
-        element.appendChild(self.render())
-        self.recursive_call("on_ready")
-        self.add_python_css_classes()
+            if not element:
+                raise RuntimeError(f"Element {selector_or_element} not found")
+
+            with timings.measure("render", self):
+                rendered_element = self.render()
+
+            with timings.measure("patch", self):
+                existing_element = self._get_replaceable_element(element, replacing)
+                if existing_element is not None:
+                    patch_dom_element(rendered_element, existing_element, match_ids=False)
+                    self.recursive_call("_attach_event_listeners")
+                else:
+                    element.innerHTML = ""
+                    element.appendChild(rendered_element)
+                    self.recursive_call("_attach_event_listeners", rendered=True)
+
+            if isinstance(self, Page):
+                self._attach_delegated_listeners()
+
+            with timings.measure("on_ready", self):
+                self.recursive_call("on_ready")
+            with timings.measure("css", self):
+                self.add_python_css_classes()
+
+    def get_timings(self):
+        """
+        Returns the application's `Timings` if instrumentation is enabled, or a stand-in that measures nothing.
+        """
+        application = self.application
+        return getattr(application, "timings", None) or no_timings
+
+    def _get_replaceable_element(self, element, replacing):
+        if replacing is None or element.childNodes.length != 1:
+            return None
+        existing_element = element.firstChild
+        if (
+            existing_element.nodeType == 1
+            and existing_element.tagName.lower() == self.tag_name.lower()
+            and existing_element.getAttribute("id") == replacing.element_id
+        ):
+            return existing_element
 
     def add_python_css_classes(self):
         """
@@ -469,6 +1001,8 @@ class Tag:
         try:
             for attr in self.element.attributes:
                 if attr.name not in self.attrs and attr.name != "id":
+                    if self._retained_attrs is None:
+                        self._retained_attrs = {}
                     self._retained_attrs[attr.name] = attr.value
         except ElementNotInDom:
             pass
@@ -528,6 +1062,7 @@ class Tag:
         if new_parent == existing_parent:
             if new_parent and self not in new_parent.children:
                 existing_parent.children.append(self)
+            self._parent = new_parent
             return
 
         if existing_parent and self in existing_parent.children:
@@ -548,39 +1083,47 @@ class Tag:
         if self in self.page.redraw_list:
             self.page.redraw_list.remove(self)
 
+        # Looked up fresh, in case something outside PuePy has removed or replaced the element
         try:
-            element = self.element
+            element = self._element = self._find_element()
         except ElementNotInDom:
+            self._element = None
             return
+        self._element_verified = True
 
-        if is_server_side:
-            old_active_element_id = None
-        else:
-            old_active_element_id = self.document.activeElement.id if self.document.activeElement else None
+        timings = self.get_timings()
+        with timings.measure("redraw", self):
+            if is_server_side:
+                old_active_element_id = None
+            else:
+                old_active_element_id = self.document.activeElement.id if self.document.activeElement else None
 
-            self.recursive_call("_retain_implicit_attrs")
+                self.recursive_call("_retain_implicit_attrs")
 
-        self.children = []
+            self.children = []
 
-        attrs = self.get_default_attrs()
-        attrs.update(self.attrs)
+            attrs = self.get_default_attrs()
+            attrs.update(self.attrs)
 
-        self.update_title()
-        with self:
-            self.generate_children()
+            self.update_title()
+            with self:
+                self.generate_children(timings)
 
-        staging_element = self._create_element(attrs)
+            with timings.measure("render", self):
+                staging_element = self._create_element(attrs)
 
-        self._render_onto(staging_element, attrs)
+                self._render_onto(staging_element, attrs)
 
-        patch_dom_element(staging_element, element)
+            with timings.measure("patch", self):
+                patch_dom_element(staging_element, element)
+                self.recursive_call("_attach_event_listeners", kept=patch_keeps_elements())
 
-        if old_active_element_id is not None:
-            el = self.document.getElementById(old_active_element_id)
-            if el:
-                el.focus()
+            if old_active_element_id is not None:
+                el = self.document.getElementById(old_active_element_id)
+                if el:
+                    el.focus()
 
-        self.recursive_call("on_redraw")
+            self.recursive_call("on_redraw")
 
     def trigger_event(self, event, detail=None, **kwargs):
         """
@@ -653,6 +1196,14 @@ class Component(Tag, Stateful):
         redraw_on_state_changes (bool): Whether the component should redraw when its state changes. To be defined as a class attribute on subclasses.
         redraw_on_app_state_changes (bool): Whether the component should redraw when the application state changes. To be defined as a class attribute on subclasses.
         props (list): A list of props for the component. To be defined as a class attribute on subclasses.
+        styles (dict): CSS for the component, mapping selectors to rules. The styles are scoped to the component,
+            compiled once per class and added to the document the first time the component is rendered. See
+            `ScopedStyles`. To be defined as a class attribute on subclasses.
+        static (bool): Whether the component's content is static, not depending on state. Static components are
+            populated and rendered once per class and set of prop values, into a template that is then cloned for
+            every instance and redraw. Their content can't have event handlers, binds or refs that are used later.
+            Instances given slot content or children are rendered as usual. To be defined as a class attribute on
+            subclasses.
     """
 
     enclosing_tag = "div"
@@ -661,6 +1212,8 @@ class Component(Tag, Stateful):
     redraw_on_app_state_changes = True
 
     props = []
+    styles = None
+    static = False
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, tag_name=self.enclosing_tag, **kwargs)
@@ -674,19 +1227,149 @@ class Component(Tag, Stateful):
 
         super()._handle_attrs(kwargs)
 
-    def _handle_props(self, kwargs):
-        if not hasattr(self, "props_expanded"):
-            self._expanded_props()
+    def _static_template_key(self):
+        try:
+            key = (type(self), tuple(sorted(self.props_values.items())))
+            hash(key)
+        except TypeError:
+            # Prop values that can't be hashed can't be matched up with a template
+            return None
+        return key
+
+    def generate_children(self, timings=None):
+        if self.static:
+            key = self._static_template_key()
+            # Children passed in by the caller make this instance's content its own, so it isn't matched up with a
+            # template
+            if key is not None and not self.children:
+                if key in _static_templates:
+                    # The content will be cloned from the template (or, during the first render, from the one the
+                    # first instance with these props is about to render), so there's nothing to populate
+                    self._static_populated = False
+                    self._static_child_count = 0
+                    return
+                _store_static_template(key, None)
+        super().generate_children(timings)
+        self._static_populated = True
+        self._static_child_count = len(self.children)
+
+    def _populate_static_content(self):
+        # Populates an instance that skipped populating because it expected to be cloned from a template. Anything the
+        # caller has added since goes after the component's own content, as it would have if it had populated.
+        added = self.children
+        self.children = []
+        with self:
+            super().generate_children()
+        self.children.extend(added)
+        self._static_populated = True
+
+    def _has_caller_content(self):
+        if len(self.children) > getattr(self, "_static_child_count", 0):
+            return True
+        for slot in self.slots.values():
+            if slot.children:
+                return True
+        return False
 
-        self.props_values = {}
-        for name, prop in self.props_expanded.items():
-            value = kwargs.pop(prop.name, prop.default_value)
+    def render_children(self, element):
+        if not self.static:
+            return super().render_children(element)
+
+        key = self._static_template_key()
+        if key is None or self._has_caller_content():
+            # Content that differs between instances (slots, children) can't come from a shared template
+            if not getattr(self, "_static_populated", True):
+                self._populate_static_content()
+            return super().render_children(element)
+
+        template = _static_templates.get(key)
+        if template is None:
+            if not getattr(self, "_static_populated", False):
+                # The instance that was going to render the template didn't, so populate here instead
+                self._populate_static_content()
+            template = self._compile_static_template()
+            _store_static_template(key, template)
+        _stamp_static_template(element, template)
+
+    def _compile_static_template(self):
+        for tag in _descendant_tags(self):
+            if tag._kwarg_event_listeners or tag._manually_added_event_listeners or tag.bind:
+                raise Exception(f"Static component {self} can't contain event handlers or binds ({tag})")
+
+        staging = self.document.createElement(self.enclosing_tag)
+        super().render_children(staging)
+
+        # The content is cloned for every instance, so ids would no longer be unique, and the tags that rendered it
+        # won't be used again
+        _remove_ids(staging)
+        self.children = []
+        self.refs = {}
+
+        if is_server_side:
+            return staging
+        template = self.document.createElement("template")
+        while staging.firstChild:
+            template.content.appendChild(staging.firstChild)
+        return template
+
+    @classmethod
+    def get_scoped_styles(cls):
+        """
+        Returns the component class's compiled `styles`, or None if it has none. Compiled once per class.
+
+        Returns:
+            (ScopedStyles): The compiled styles
+        """
+        cached = getattr(cls, "_scoped_styles", None)
+        if cached is None or cached[0] is not cls.styles:
+            cached = (cls.styles, ScopedStyles(cls.__name__, cls.styles) if cls.styles else None)
+            cls._scoped_styles = cached
+        return cached[1]
+
+    def get_render_classes(self, attrs):
+        class_names = super().get_render_classes(attrs)
+
+        scoped_styles = self.get_scoped_styles()
+        if scoped_styles:
+            class_names.add(scoped_styles.class_name)
+            if scoped_styles.class_name not in css_registry.class_names:
+                # Only the first render of each component class adds its styles; Page.add_python_css_classes checks
+                # once per mount that they're still in the document
+                css_registry.add(self.document, [scoped_styles])
+        return class_names
+
+    def _handle_props(self, kwargs):
+        props_values = {}
+        for name, default_value in self._get_prop_defaults():
+            value = kwargs.pop(name, default_value)
             setattr(self, name, value)
-            self.props_values[name] = value
+            props_values[name] = value
+        self.props_values = props_values
+
+    @classmethod
+    def get_props(cls):
+        """
+        Returns the component class's props as `Prop` objects, keyed by name. The table is compiled once per class (and
+        again if the class's `props` is replaced), so like `default_classes`, `props` is treated as a constant.
+
+        Returns:
+            (dict): The class's props
+        """
+        if getattr(cls, "_props_expanded_from", None) is not cls.props:
+            cls._expanded_props()
+        return cls.props_expanded
+
+    @classmethod
+    def _get_prop_defaults(cls):
+        cls.get_props()
+        return cls._prop_defaults
 
     @classmethod
     def _expanded_props(cls):
         # This would be ideal for metaprogramming, but we do it this way to be compatible with Micropython. :/
+        #
+        # Subclasses inherit their parent's compiled table along with its props, so it's tied to the props list it was
+        # compiled from, and compiled again for any subclass that defines its own.
         props_expanded = {}
         for prop in cls.props:
             if isinstance(prop, Prop):
@@ -698,6 +1381,8 @@ class Component(Tag, Stateful):
             else:
                 raise PropsError(f"Unknown prop type {type(prop)}")
         cls.props_expanded = props_expanded
+        cls._prop_defaults = tuple((name, prop.default_value) for name, prop in props_expanded.items())
+        cls._props_expanded_from = cls.props
 
     def initial(self):
         """
@@ -764,6 +1449,9 @@ class Component(Tag, Stateful):
         #
         # We put this here, so it clears the children only when the slot-filler is doing its filling.
         # Otherwise, the previous children are kept. Lucky them.
+        if self.static and not getattr(self, "_static_populated", True):
+            # A static component that's going to be cloned hasn't created its slots, so it's populated after all
+            self._populate_static_content()
         self.slots[name].children = []
         return self.slots[name]
 
@@ -787,6 +1475,31 @@ class Component(Tag, Stateful):
 
 
 class Page(Component):
+    """
+    A page is the top-level component mounted by the application, usually in response to a route.
+
+    Attributes:
+        loaders (dict): Async data loaders, keyed by the name of the prop each one provides. When the application mounts
+            the page, every loader is awaited concurrently and the results are passed to the page as props, so the page
+            renders once, with its data. Each loader is called with the application and the route's arguments as
+            keyword arguments, eg, `async def load_user(application, user_id, **kwargs)`. To be defined as a class
+            attribute on subclasses; loaders from base page classes are included too.
+        loader_ttl (int or float): How many seconds loader results are cached for, keyed by loader and route
+            arguments. The default, 0, disables caching.
+        delegate_events (bool): If True, event handlers (`on_click=`, `bind=`, etc) on the page's tags aren't added to
+            each element. Instead, the page adds one listener per event type to its own element and dispatches events
+            to the right tag by element id, which saves a lot of memory on pages with many handlers. Delegated
+            handlers run before listeners added to elements directly; see the components guide.
+        tag_pool_size (int): How many plain tags (not components) released by a redraw are kept for reuse by later
+            redraws, rather than allocating new ones. Off (0) by default. Only enable it if nothing keeps a reference
+            to tags after they're no longer drawn, since a pooled tag is reused for something else.
+    """
+
+    loaders = {}
+    loader_ttl = 0
+    delegate_events = False
+    tag_pool_size = 0
+
     def __init__(self, matched_route=None, application=None, **kwargs):
         ref = mixed_to_underscores(self.__class__.__name__)
         self.matched_route = matched_route
@@ -797,10 +1510,114 @@ class Page(Component):
         self._redraw_timeout_set = False
         self.redraw_list = set()
 
+        # Delegated event listeners: {event type: {element id: [listeners]}}
+        self._delegated_listeners = {}
+        self._delegation_root = None
+        self._delegation_root_events = set()
+        self._delegation_proxy = None
+
+        # Plain tags released by redraws, for reuse (see tag_pool_size)
+        self._tag_pool = []
+
         super().__init__(ref=ref, **kwargs)
         if self.application:
             self.add_context("app", self.application.state)
 
+    @classmethod
+    def get_loaders(cls):
+        """
+        Returns the loaders for this page class, including those defined on its base classes.
+
+        Returns:
+            (dict): Loaders keyed by prop name
+        """
+        loaders = {}
+        for base in cls.__bases__:
+            if issubclass(base, Page):
+                loaders.update(base.get_loaders())
+        loaders.update(cls.loaders)
+        return loaders
+
+    def _recycle_tag(self, tag):
+        if len(self._tag_pool) < self.tag_pool_size:
+            # Drop what it refers to, so a pooled tag doesn't keep old tags and elements alive. Everything is set
+            # afresh when it's reused.
+            tag._parent = tag.parent_component = tag.origin = tag.bind = None
+            tag.children = tag.refs = tag.attrs = tag._refs_pending_removal = tag._kwarg_event_listeners = None
+            tag._element = tag._rendered_element = None
+            self._tag_pool.append(tag)
+
+    def _delegate_event_listener(self, element_id, event, listener):
+        listeners_by_id = self._delegated_listeners.get(event)
+        if listeners_by_id is None:
+            listeners_by_id = self._delegated_listeners[event] = {}
+        if element_id in listeners_by_id:
+            listeners_by_id[element_id].append(listener)
+        else:
+            listeners_by_id[element_id] = [listener]
+
+        if self._delegation_root is not None and event not in self._delegation_root_events:
+            self._add_delegation_root_listener(event)
+
+    def _undelegate_event_listener(self, element_id, event, listener):
+        listeners = self._delegated_listeners.get(event, {}).get(element_id)
+        if listeners and listener in listeners:
+            listeners.remove(listener)
+            if not listeners:
+                del self._delegated_listeners[event][element_id]
+
+    def _attach_delegated_listeners(self):
+        if not self.delegate_events or is_server_side:
+            return
+        root = self.element
+        if self._delegation_root is not None and self._delegation_root != root:
+            self._remove_delegation_root_listeners()
+        self._delegation_root = root
+        for event in self._delegated_listeners:
+            if event not in self._delegation_root_events:
+                self._add_delegation_root_listener(event)
+
+    def _add_delegation_root_listener(self, event):
+        if self._delegation_proxy is None:
+            self._delegation_proxy = create_proxy(self._dispatch_delegated_event)
+        # Listen during the capture phase, so events that don't bubble (focus, custom events, etc) are seen too
+        self._delegation_root.addEventListener(event, self._delegation_proxy, True)
+        self._delegation_root_events.add(event)
+
+    def _remove_delegation_root_listeners(self):
+        while self._delegation_root_events:
+            self._delegation_root.removeEventListener(self._delegation_root_events.pop(), self._delegation_proxy, True)
+        self._delegation_root = None
+
+    def _remove_event_listeners(self):
+        super()._remove_event_listeners()
+        if self._delegation_root is not None:
+            self._remove_delegation_root_listeners()
+        if self._delegation_proxy is not None and hasattr(self._delegation_proxy, "destroy"):
+            self._delegation_proxy.destroy()
+        self._delegation_proxy = None
+
+    def _dispatch_delegated_event(self, event):
+        """
+        Calls the delegated listeners for an event, starting at its target and moving up towards the page's element,
+        much like the browser would if the listeners had been added to each element.
+        """
+        listeners_by_id = self._delegated_listeners.get(event.type)
+        if not listeners_by_id:
+            return
+
+        node = event.target
+        while node is not None and node.nodeType == 1:
+            element_id = node.getAttribute("id")
+            if element_id in listeners_by_id:
+                for listener in listeners_by_id[element_id][:]:
+                    listener(event)
+                if event.cancelBubble:
+                    break
+            if element_id == self.element_id or not event.bubbles:
+                break
+            node = node.parentNode
+
     def update_title(self):
         title = self.page_title()
         if title is not None:
@@ -843,44 +1660,49 @@ class Page(Component):
 
     def add_python_css_classes(self):
         """
-        Iterates over Python css classes defined by elements and puts them in the head of the document.
+        Adds any Python css classes defined by elements that aren't already in the document to the head of the
+        document. Also adds back any styles that went missing, eg because the style element was replaced.
         """
-        css_class: CssClass
-        css_rules = []
-        for css_class in self.python_css_classes:
-            css_rules.append(css_class.render_css())
-
-        if css_rules:
-            el = self.document.getElementById("puepy-runtime-css")
-            if el:
-                created = False
-            else:
-                el = self.document.createElement("style")
-                el.type = "text/css"
-                created = True
-            el.innerHTML = ""
-            el.appendChild(self.document.createTextNode("\n".join(css_rules)))
-            if created:
-                self.document.head.appendChild(el)
+        css_registry.check(self.document)
+        if self.python_css_classes:
+            css_registry.add(self.document, self.python_css_classes)
 
 
 class Builder:
     def __init__(self):
         self.components = {}
+        self.lazy_components = {}
+        self._factories = {}
 
-    # noinspection t
-    def generate_tag(self, tag_name, *children, **kwargs):
+    def _resolve_tag_name(self, tag_name):
         tag_name = tag_name.lower().strip()
-        if kwargs.get("tag"):
-            tag_name = kwargs.pop("tag")
-        elif "_" in tag_name:
-            tag_name = tag_name.replace("_", "-")
 
         if tag_name == "insert_slot":
             print(f"Called t.insert_slot. Did you mean self.insert_slot?")
         elif tag_name == "slot":
             print(f"Called t.slot. Did you mean <component>.slot?")
 
+        if "_" in tag_name:
+            tag_name = tag_name.replace("_", "-")
+        return tag_name, self._get_component(tag_name)
+
+    def _get_component(self, tag_name):
+        component_class = self.components.get(tag_name)
+        if component_class is None and tag_name in self.lazy_components:
+            # First use of a lazily registered component, so import it now
+            component_class = self.components[tag_name] = import_object(self.lazy_components.pop(tag_name))
+        return component_class
+
+    # noinspection t
+    def generate_tag(self, tag_name, *children, **kwargs):
+        if kwargs.get("tag"):
+            tag_name = kwargs.pop("tag")
+            component_class = self._get_component(tag_name)
+        else:
+            tag_name, component_class = self._resolve_tag_name(tag_name)
+        return self._generate_tag(tag_name, component_class, children, kwargs)
+
+    def _generate_tag(self, tag_name, component_class, children, kwargs):
         parent = Tag.stack[-1] if Tag.stack else None
         parent_component = Tag.component_stack[-1] if Tag.component_stack else None
         root_tag = Tag.stack[0] if Tag.stack else None
@@ -895,10 +1717,17 @@ class Builder:
         else:
             raise Exception("t.generate_tag called without a context")
 
-        # Determine ref value
-        ref_part = "__" + (f"{parent.ref}.{tag_name}_{len(parent.children) + 1}").lstrip("_")
-
-        ref = kwargs.pop("ref", ref_part)
+        # Determine ref value. Auto refs name the parent by a short id, kept by the origin for as long as the parent
+        # exists, rather than by the parent's own ref, so they stay short however deeply tags are nested.
+        ref = kwargs.pop("ref", None)
+        if ref is None:
+            if origin._auto_ref_ids is None:
+                origin._auto_ref_ids = {}
+            parent_id = origin._auto_ref_ids.get(parent.ref)
+            if parent_id is None:
+                parent_id = origin._auto_ref_ids[parent.ref] = origin._next_auto_ref_id
+                origin._next_auto_ref_id += 1
+            ref = f"__{parent_id}.{tag_name}_{len(parent.children) + 1}"
 
         if ref and origin and ref in origin._refs_pending_removal:
             element: Tag = origin._refs_pending_removal.pop(ref)
@@ -909,8 +1738,21 @@ class Builder:
             if children:
                 element.add(*children)
             element.parent = parent
-        elif tag_name in self.components:
-            element = self.components[tag_name](
+        elif component_class is not None:
+            element = component_class(
+                ref=ref,
+                page=page,
+                parent=parent,
+                parent_component=parent_component,
+                origin=origin,
+                children=children,
+                **kwargs,
+            )
+        elif page._tag_pool:
+            # Reuse a tag released by an earlier redraw rather than allocating a new one
+            element = page._tag_pool.pop()
+            element.__init__(
+                tag_name,
                 ref=ref,
                 page=page,
                 parent=parent,
@@ -952,6 +1794,37 @@ class Builder:
         else:
             component_name = mixed_to_underscores(component.__name__, "-")
         self.components[component_name.lower()] = component
+        self.lazy_components.pop(component_name.lower(), None)
+        self._clear_factories()
+
+    def add_lazy_component(self, name, import_path):
+        """
+        Registers a component by its import path, without importing it. The module is imported when the component is
+        first used, so that large component libraries don't slow down startup with modules that might not be needed.
+
+        Args:
+            name (str): The component's tag name, eg "date-picker" (or "date_picker"), to be used as `t.date_picker`.
+            import_path (str): Where to import the component class from, eg "myapp.widgets:DatePicker".
+
+        Examples:
+            ``` py
+            t.add_lazy_component("sl-dialog", "shoelace.dialog:Dialog")
+            ```
+        """
+        name = name.lower().replace("_", "-")
+        self.lazy_components[name] = import_path
+        self.components.pop(name, None)
+        self._clear_factories()
+
+    def add_lazy_library(self, components):
+        """
+        Registers several components by import path, without importing them (see `add_lazy_component`).
+
+        Args:
+            components (dict): Import paths, keyed by component tag name.
+        """
+        for name, import_path in components.items():
+            self.add_lazy_component(name, import_path)
 
     def __call__(self, *texts):
         parent = Tag.stack[-1] if Tag.stack else None
@@ -960,11 +1833,28 @@ class Builder:
         parent.add(*texts)
 
     def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        # Resolve the tag name and component once per attribute name, and keep the factory as an attribute, so later
+        # lookups of the same name don't come through here at all
+        tag_name, component_class = self._resolve_tag_name(name)
+
         def _tag(*children, **kwargs):
-            return self.generate_tag(name, *children, **kwargs)
+            if kwargs.get("tag"):
+                return self.generate_tag(name, *children, **kwargs)
+            return self._generate_tag(tag_name, component_class, children, kwargs)
 
+        self._factories[name] = _tag
+        setattr(self, name, _tag)
         return _tag
 
+    def _clear_factories(self):
+        # Called when components are registered, since a cached factory might have resolved to a plain tag
+        for name in self._factories:
+            delattr(self, name)
+        self._factories = {}
+
 
 t = Builder()
 
@@ -23,55 +23,89 @@ from .runtime import window, history, platform, PLATFORM_MICROPYTHON, is_server_
 from .util import mixed_to_underscores, jsobj
 
 
-def _micropython_parse_query_string(query_string):
+_HEX_DIGITS = "0123456789abcdefABCDEF"
+
+
+def _decode_utf8(data):
+    try:
+        return bytes(data).decode("utf-8")
+    except UnicodeError:
+        return "".join(chr(b) for b in data)
+
+
+def url_unquote(s):
     """
-    In MicroPython, urllib isn't available and we can't use the JavaScript library:
-    https://github.com/pyscript/pyscript/issues/2100
+    Decodes a URL-encoded query string component, treating `+` as a space and `%XX` escapes as UTF-8 bytes. Invalid
+    escapes are left as they are.
+
+    This is deliberately plain Python (no regex, no urllib, no JavaScript) so that it behaves the same on CPython,
+    Pyodide and MicroPython.
     """
-    if query_string and query_string[0] == "?":
-        query_string = query_string[1:]
-
-    def url_decode(s):
-        # Decode URL-encoded characters without using regex, which is also pretty broken in MicroPython...
-        i = 0
-        length = len(s)
-        decoded = []
-
-        while i < length:
-            if s[i] == "%":
-                if i + 2 < length:
-                    hex_value = s[i + 1 : i + 3]
-                    decoded.append(chr(int(hex_value, 16)))
-                    i += 3
-                else:
-                    decoded.append("%")
-                    i += 1
-            elif s[i] == "+":
-                decoded.append(" ")
-                i += 1
-            else:
-                decoded.append(s[i])
-                i += 1
+    if "+" in s:
+        s = s.replace("+", " ")
+    if "%" not in s:
+        return s
+
+    chunks = s.split("%")
+    decoded = [chunks[0]]
+    pending = bytearray()
+    for chunk in chunks[1:]:
+        if len(chunk) >= 2 and chunk[0] in _HEX_DIGITS and chunk[1] in _HEX_DIGITS:
+            pending.append(int(chunk[:2], 16))
+            if len(chunk) > 2:
+                decoded.append(_decode_utf8(pending))
+                decoded.append(chunk[2:])
+                pending = bytearray()
+        else:
+            if pending:
+                decoded.append(_decode_utf8(pending))
+                pending = bytearray()
+            decoded.append("%")
+            decoded.append(chunk)
+    if pending:
+        decoded.append(_decode_utf8(pending))
+    return "".join(decoded)
 
-        return "".join(decoded)
 
-    params = {}
-    for part in query_string.split("&"):
-        if "=" in part:
-            key, value = part.split("=", 1)
-            key = url_decode(key)
-            value = url_decode(value)
+_last_parsed_query = (None, None)
+
+
+def parse_query_string(query_string):
+    """
+    Parses a query string (with or without a leading `?`) into a dictionary of lists, eg, `"a=1&a=2&b"` becomes
+    `{"a": ["1", "2"], "b": [""]}`.
+
+    The last query string parsed is remembered, so matching the same URL repeatedly doesn't parse it again.
+
+    Args:
+        query_string (str): The query string to parse.
+
+    Returns:
+        (dict): A new dictionary mapping each key to a list of its values.
+    """
+    global _last_parsed_query
+
+    last_query_string, params = _last_parsed_query
+    if query_string != last_query_string:
+        params = {}
+        for part in query_string[1:].split("&") if query_string[:1] == "?" else query_string.split("&"):
+            if not part:
+                continue
+            if "=" in part:
+                key, value = part.split("=", 1)
+                key = url_unquote(key)
+                value = url_unquote(value)
+            else:
+                key = url_unquote(part)
+                value = ""
             if key in params:
                 params[key].append(value)
             else:
                 params[key] = [value]
-        else:
-            key = url_decode(part)
-            if key in params:
-                params[key].append("")
-            else:
-                params[key] = ""
-    return params
+        _last_parsed_query = (query_string, params)
+
+    # Copy, since callers are free to modify what they get back
+    return {key: values[:] for key, values in params.items()}
 
 
 if platform == PLATFORM_MICROPYTHON:
@@ -83,21 +117,29 @@ if platform == PLATFORM_MICROPYTHON:
 else:
     from urllib.parse import quote as url_quote
 
-if is_server_side:
-    from urllib.parse import urlparse, parse_qs
 
-    def parse_query_string(qs):
-        return parse_qs(urlparse(qs).query)
+REVERSE_CACHE_SIZE = 256
 
-elif platform == PLATFORM_MICROPYTHON:
-    parse_query_string = _micropython_parse_query_string
 
-else:
-    import js
-
-    def parse_query_string(qs):
-        usp = js.URLSearchParams.new(qs)
-        return {key: list(usp.getAll(key)) for key in usp.keys()}
+def _compile_path_template(path_match):
+    """
+    Splits a path template such as `/users/<username>/posts` into a list of `(text, placeholder_name)` segments, eg,
+    `[("/users/", None), ("<username>", "username"), ("/posts", None)]`.
+    """
+    segments = []
+    position = 0
+    while True:
+        start = path_match.find("<", position)
+        end = path_match.find(">", start + 1) if start != -1 else -1
+        if end == -1:
+            break
+        if start > position:
+            segments.append((path_match[position:start], None))
+        segments.append((path_match[start : end + 1], path_match[start + 1 : end]))
+        position = end + 1
+    if position < len(path_match):
+        segments.append((path_match[position:], None))
+    return segments
 
 
 class Route:
@@ -109,7 +151,7 @@ class Route:
         use the @app.page decorator to define a route at the time you define your Pages.
     """
 
-    def __init__(self, path_match: str, page: Page, name: str, base_path: str, router=None):
+    def __init__(self, path_match: str, page: Page, name: str, base_path: str, router=None, loaders=None):
         """
         Args:
             path_match (str): The path match pattern used for routing.
@@ -117,12 +159,30 @@ class Route:
             name (str): The name of the page.
             base_path (str): The base path used for routing.
             router (Router, optional): An optional parameter representing the router used for routing.
+            loaders (dict, optional): Async data loaders to run before the page is mounted, keyed by the prop each
+                one fills. These are added to (and override) any loaders defined on the page class.
         """
         self.path_match = path_match
         self.page = page
         self.name = name
         self.base_path = base_path
         self.router = router
+        self.loaders = loaders or {}
+
+    @property
+    def path_match(self):
+        return self._path_match
+
+    @path_match.setter
+    def path_match(self, value):
+        self._path_match = value
+        self._pattern_parts = [
+            (part[1:-1], True) if part.startswith("<") and part.endswith(">") else (part, False)
+            for part in value.strip("/").split("/")
+        ]
+        self._reverse_segments = _compile_path_template(value)
+        self._placeholders = set(name for _, name in self._reverse_segments if name is not None)
+        self._reverse_cache = {}
 
     def match(self, path):
         """
@@ -142,15 +202,14 @@ class Route:
 
         # Simple pattern matching without regex
         parts = path.strip("/").split("/")
-        pattern_parts = self.path_match.strip("/").split("/")
+        pattern_parts = self._pattern_parts
         if len(parts) != len(pattern_parts):
             return False, None
 
         kwargs = {}
-        for part, pattern_part in zip(parts, pattern_parts):
-            if pattern_part.startswith("<") and pattern_part.endswith(">"):
-                group_name = pattern_part[1:-1]
-                kwargs[group_name] = part
+        for part, (pattern_part, is_placeholder) in zip(parts, pattern_parts):
+            if is_placeholder:
+                kwargs[pattern_part] = part
             elif part != pattern_part:
                 return False, None
 
@@ -173,14 +232,29 @@ class Route:
             generate the URL path by providing the values for "username" and "post_id" as keyword arguments:
             `route.reverse(username="john", post_id=123)` => `"/users/john/posts/123"`
         """
-        kwargs = kwargs.copy()
-        result = self.path_match
-        for key in list(kwargs.keys()):
-            if f"<{key}>" in result:
-                value = kwargs.pop(key)
-                result = result.replace(f"<{key}>", str(value))
-
-        if self.router and self.router.link_mode == Router.LINK_MODE_HASH:
+        link_mode = self.router.link_mode if self.router else None
+        try:
+            cache_key = (link_mode, self.base_path, tuple(sorted((k, type(v), v) for k, v in kwargs.items())))
+            path = self._reverse_cache.get(cache_key)
+        except TypeError:
+            # Unhashable argument values can't be memoized
+            cache_key = path = None
+        if path is not None:
+            return path
+
+        path = self._reverse(link_mode, kwargs)
+
+        if cache_key is not None:
+            if len(self._reverse_cache) >= REVERSE_CACHE_SIZE:
+                self._reverse_cache.clear()
+            self._reverse_cache[cache_key] = path
+        return path
+
+    def _reverse(self, link_mode, kwargs):
+        result = "".join(str(kwargs[name]) if name in kwargs else text for text, name in self._reverse_segments)
+        kwargs = {k: v for k, v in kwargs.items() if k not in self._placeholders}
+
+        if link_mode == Router.LINK_MODE_HASH:
             result = "#" + result
 
         if self.base_path:
@@ -260,7 +334,7 @@ class Router:
         self.routes_by_page[route.page] = route
         route.router = self
 
-    def add_route(self, path_match, page_class, name=None):
+    def add_route(self, path_match, page_class, name=None, loaders=None):
         """
         Adds a route to the router. This method creates a new Route instance.
 
@@ -268,11 +342,14 @@ class Router:
             path_match (str): The URL path pattern to match for the route.
             page_class (Page class): The class or function to be associated with the route.
             name (str, optional): The name of the route. If not provided, the name will be derived from the page class name.
+            loaders (dict, optional): Async data loaders for the route, keyed by prop name (see `Page.loaders`).
         """
         # Convert path to a simple pattern without regex
         if not name:
             name = mixed_to_underscores(page_class.__name__)
-        self.add_route_instance(Route(path_match=path_match, page=page_class, name=name, base_path=self.base_path))
+        self.add_route_instance(
+            Route(path_match=path_match, page=page_class, name=name, base_path=self.base_path, loaders=loaders)
+        )
 
     def reverse(self, destination, **kwargs):
         """
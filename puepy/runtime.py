@@ -1,3 +1,4 @@
+import asyncio
 import sys
 
 PLATFORM_PYODIDE = "pyodide"
@@ -23,15 +24,28 @@ if platform == PLATFORM_PYODIDE:
 elif platform == PLATFORM_MICROPYTHON:
     from pyscript.ffi import create_proxy
 
-    from js import addEventListener, removeEventListener
+    # Like pyodide.ffi.wrappers, keep the proxy made for each listener, so it can actually be removed later:
+    # {(event, listener): [(element, proxy), ...]}
+    _event_listener_proxies = {}
 
     def add_event_listener(elt, event, listener):
-        return elt.addEventListener(event, listener)
+        proxy = create_proxy(listener)
+        key = (event, listener)
+        if key in _event_listener_proxies:
+            _event_listener_proxies[key].append((elt, proxy))
+        else:
+            _event_listener_proxies[key] = [(elt, proxy)]
+        return elt.addEventListener(event, proxy)
 
     def remove_event_listener(elt, event, listener):
-        return elt.removeEventListener(event, create_proxy(listener))
-
-    # add_event_listener, remove_event_listener = addEventListener, removeEventListener
+        key = (event, listener)
+        proxies = _event_listener_proxies.get(key, [])
+        for i, (proxy_elt, proxy) in enumerate(proxies):
+            if proxy_elt == elt:
+                del proxies[i]
+                if not proxies:
+                    del _event_listener_proxies[key]
+                return elt.removeEventListener(event, proxy)
 
 if is_server_side:
     document = setTimeout = Object = CustomEvent = window = history = add_event_listener = remove_event_listener = None
@@ -47,3 +61,13 @@ else:
 
     def next_tick(fn):
         setTimeout(create_proxy(fn), 100)
+
+
+def create_task(coro):
+    """
+    Schedules a coroutine to run on the event loop (in the browser, that's the page's own loop).
+    """
+    if platform == PLATFORM_MICROPYTHON:
+        return asyncio.create_task(coro)
+    else:
+        return asyncio.ensure_future(coro)
@@ -8,8 +8,16 @@ behavior for interacting with storage items.
 
 Classes:
     BrowserStorage: A class that provides dictionary-like access to browser storage objects.
+    JsonSerializer: Stores values as JSON, so they keep their types.
+    PersistedState: Keeps a ReactiveDict in sync with a BrowserStorage.
+    AsyncStorage: The async, dictionary-like interface shared by IndexedDBStorage and MemoryStorage.
+    IndexedDBStorage: Async storage backed by an IndexedDB object store, for data too big for localStorage.
+    MemoryStorage: An in-memory stand-in for IndexedDBStorage, for tests and server side code.
 """
 
+import asyncio
+import json
+
 try:
     from js import Object
 
@@ -17,15 +25,48 @@ try:
 except ImportError:
     is_server_side = True
 
+from .runtime import add_event_listener, remove_event_listener, create_proxy, setTimeout, window
+
+
+class JsonSerializer:
+    """
+    Serializes storage values as JSON, so numbers, booleans, lists, dicts and None are stored and read back as
+    themselves rather than as strings. Values that aren't valid JSON, eg ones written by other code, are read as
+    strings.
+    """
+
+    def dumps(self, value):
+        return json.dumps(value)
+
+    def loads(self, text):
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+
 
 class BrowserStorage:
     """
     Provides dictionary-like interface to browser storage objects.
 
+    By default, values are stored with `str()` and read back as strings. Passing a serializer, such as
+    `JsonSerializer`, makes the storage typed: values are serialized on the way in and deserialized on the way out, and
+    are kept in an in-memory cache, so reading the same key again doesn't cross into JavaScript. The cache is filled as
+    keys are read, written through on every change, and invalidated by `storage` events, which browsers send when
+    another tab changes the same storage. Values read from the cache are shared, so to change a stored list or dict,
+    assign it back to its key.
+
     Attributes:
         target: The browser storage object (e.g., localStorage, sessionStorage).
         description (str): Description of the storage instance.
-
+        serializer: An object with `dumps(value)` and `loads(text)` methods, or None to store strings.
+
+    Examples:
+        ``` py
+        settings = BrowserStorage(localStorage, "settings", serializer=JsonSerializer())
+        settings["page_size"] = 50
+        settings["page_size"] + 10  # 60
+        ```
     """
 
     class NoDefault:
@@ -33,16 +74,76 @@ class BrowserStorage:
 
         pass
 
-    def __init__(self, target, description):
+    def __init__(self, target, description, serializer=None, cache=None):
         """
         Initializes the BrowserStorage instance.
 
         Args:
             target: The browser storage object.
             description (str): Description of the storage instance.
+            serializer: An object with `dumps(value)` and `loads(text)` methods, eg `JsonSerializer()`, or None to
+                store strings.
+            cache (bool): Whether to keep values in an in-memory cache. Defaults to True if a serializer is given.
         """
         self.target = target
         self.description = description
+        self.serializer = serializer
+
+        if cache is None:
+            cache = serializer is not None
+        self._cache = {} if cache else None
+        if cache and not is_server_side:
+            add_event_listener(window, "storage", self._on_storage)
+
+    def _is_own_event(self, event):
+        # Storage events fire on window for every storage area, eg sessionStorage as well as localStorage
+        if is_server_side:
+            return event.storageArea is self.target
+        return getattr(Object, "is")(event.storageArea, self.target)
+
+    def _on_storage(self, event):
+        if not self._is_own_event(event):
+            return
+        if event.key is None:
+            # Another tab cleared its storage
+            self.invalidate()
+        else:
+            self._cache.pop(event.key, None)
+
+    def invalidate(self, key=None):
+        """
+        Discards cached values, so they are read from storage again. Only needed if the storage is changed by code
+        other than this object in the same tab.
+
+        Args:
+            key (str): The key to discard, or None to discard everything.
+        """
+        if self._cache is not None:
+            if key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(key, None)
+
+    def _load(self, key):
+        # Returns the deserialized value for the key, or NoDefault if there isn't one
+        cache = self._cache
+        if cache is not None and key in cache:
+            return cache[key]
+
+        text = self.target.getItem(key)
+        if text is None:
+            value = self.NoDefault
+        elif self.serializer is None:
+            value = text
+        else:
+            value = self.serializer.loads(text)
+
+        if cache is not None:
+            cache[key] = value
+        return value
+
+    def _decode(self, text):
+        return text if self.serializer is None else self.serializer.loads(text)
 
     def __getitem__(self, key):
         """
@@ -57,8 +158,8 @@ class BrowserStorage:
         Raises:
             KeyError: If the key does not exist in the storage.
         """
-        value = self.target.getItem(key)
-        if value is None:
+        value = self._load(key)
+        if value is self.NoDefault:
             raise KeyError(key)
         return value
 
@@ -70,7 +171,12 @@ class BrowserStorage:
             key (str): The key for the item to set.
             value: The value to associate with the key.
         """
-        self.target.setItem(key, str(value))
+        if self.serializer is None:
+            self.target.setItem(key, str(value))
+        else:
+            self.target.setItem(key, self.serializer.dumps(value))
+        if self._cache is not None:
+            self._cache[key] = value if self.serializer is not None else str(value)
 
     def __delitem__(self, key):
         """
@@ -82,9 +188,11 @@ class BrowserStorage:
         Raises:
             KeyError: If the key does not exist in the storage.
         """
-        if self.target.getItem(key) is None:
+        if self._load(key) is self.NoDefault:
             raise KeyError(key)
         self.target.removeItem(key)
+        if self._cache is not None:
+            self._cache[key] = self.NoDefault
 
     def __contains__(self, key):
         """
@@ -96,7 +204,7 @@ class BrowserStorage:
         Returns:
             bool: True if the key exists, False otherwise.
         """
-        return not self.target.getItem(key) is None
+        return self._load(key) is not self.NoDefault
 
     def __len__(self):
         """
@@ -124,7 +232,7 @@ class BrowserStorage:
             tuple: (key, value) pairs in the storage.
         """
         for item in Object.entries(self.target):
-            yield item[0], item[1]
+            yield item[0], self._decode(item[1])
 
     def keys(self):
         """
@@ -146,8 +254,8 @@ class BrowserStorage:
         Returns:
             The value associated with the key, or the default value.
         """
-        value = self.target.getItem(key)
-        if value is None:
+        value = self._load(key)
+        if value is self.NoDefault:
             return default
         else:
             return value
@@ -157,6 +265,7 @@ class BrowserStorage:
         Clears all items from the storage.
         """
         self.target.clear()
+        self.invalidate()
 
     def copy(self):
         """
@@ -181,11 +290,15 @@ class BrowserStorage:
         Raises:
             KeyError: If the key does not exist and no default value is provided.
         """
-        value = self.target.getItem(key)
-        if value is None and default is self.NoDefault:
-            raise KeyError(key)
+        value = self._load(key)
+        if value is self.NoDefault:
+            if default is self.NoDefault:
+                raise KeyError(key)
+            return default
         else:
             self.target.removeItem(key)
+            if self._cache is not None:
+                self._cache[key] = self.NoDefault
             return value
 
     def popitem(self):
@@ -240,10 +353,560 @@ class BrowserStorage:
         Returns:
             list: A list of values.
         """
-        return list(Object.values(self.target))
+        return [self._decode(value) for value in Object.values(self.target)]
+
+    def bind(self, state, keys=None, prefix="", delay=100):
+        """
+        Persists a ReactiveDict, or some of its keys, to this storage. See `PersistedState`.
+
+        Args:
+            state (ReactiveDict): The state to persist, eg `application.state`.
+            keys (list): The keys to persist. Defaults to all of them, restoring the keys the state has when it's
+                bound.
+            prefix (str): Prepended to each key in the storage, to keep different states apart.
+            delay (int): How long to wait for more changes before writing, in milliseconds.
+
+        Returns:
+            (PersistedState): The binding, which can be flushed or stopped.
+
+        Examples:
+            ``` py
+            app = Application(storage_serializer=JsonSerializer())
+            app.local_storage.bind(app.state, keys=["theme", "sidebar_open"], prefix="settings.")
+            ```
+        """
+        return PersistedState(state, self, keys=keys, prefix=prefix, delay=delay)
 
     def __str__(self):
         return self.description
 
     def __repr__(self):
         return f"<{self}>"
+
+
+class PersistedState:
+    """
+    Keeps a ReactiveDict in sync with a BrowserStorage. Values found in the storage are restored into the state when
+    it's bound, changes to the state are written to the storage, and changes made by other tabs are applied to the
+    state as their `storage` events arrive.
+
+    Writes are debounced: keys that change are collected and written together once changes stop for `delay`
+    milliseconds, so a `mutate()` block, or a burst of changes, results in a single write per key. Use a typed storage
+    (see `JsonSerializer`) so values keep their types.
+
+    Attributes:
+        state (ReactiveDict): The state being persisted.
+        storage (BrowserStorage): The storage it's persisted to.
+        keys (set): The keys persisted, or None for all of them.
+        prefix (str): Prepended to each key in the storage.
+        delay (int): How long to wait for more changes before writing, in milliseconds.
+    """
+
+    def __init__(self, state, storage, keys=None, prefix="", delay=100):
+        self.state = state
+        self.storage = storage
+        self.keys = set(keys) if keys is not None else None
+        self.prefix = prefix
+        self.delay = delay
+
+        self._pending = set()
+        self._timer_scheduled = False
+        self._syncing = False
+
+        restored = {}
+        for key in self.keys if self.keys is not None else list(state.keys()):
+            value = storage.get(prefix + key, BrowserStorage.NoDefault)
+            if value is not BrowserStorage.NoDefault:
+                restored[key] = value
+        if restored:
+            state.update(restored)
+
+        state.listener.add_callback(self._on_state_change)
+        self._flush_proxy = create_proxy(self._on_timer)
+        if not is_server_side:
+            add_event_listener(window, "storage", self._on_storage)
+
+    def _on_state_change(self, key, value):
+        if self._syncing or (self.keys is not None and key not in self.keys):
+            return
+
+        self._pending.add(key)
+        if setTimeout is None:
+            self.flush()
+        elif not self._timer_scheduled:
+            self._timer_scheduled = True
+            setTimeout(self._flush_proxy, self.delay)
+
+    def _on_timer(self):
+        self._timer_scheduled = False
+        self.flush()
+
+    def flush(self):
+        """
+        Writes any pending changes to the storage now, rather than waiting for the delay to pass.
+        """
+        pending, self._pending = self._pending, set()
+        for key in pending:
+            if key in self.state:
+                self.storage[self.prefix + key] = self.state[key]
+            else:
+                self.storage.pop(self.prefix + key, None)
+
+    def _on_storage(self, event):
+        if event.key is None or not self.storage._is_own_event(event):
+            return
+        if not event.key.startswith(self.prefix):
+            return
+        key = event.key[len(self.prefix) :]
+        if self.keys is not None and key not in self.keys:
+            return
+
+        self.storage.invalidate(event.key)
+        value = self.storage.get(event.key, BrowserStorage.NoDefault)
+
+        self._syncing = True
+        try:
+            if value is BrowserStorage.NoDefault:
+                if key in self.state:
+                    del self.state[key]
+            else:
+                self.state[key] = value
+        finally:
+            self._syncing = False
+
+    def stop(self):
+        """
+        Writes any pending changes, and stops persisting the state.
+        """
+        self.flush()
+        self.state.listener.remove_callback(self._on_state_change)
+        if not is_server_side:
+            remove_event_listener(window, "storage", self._on_storage)
+
+
+class AsyncStorage:
+    """
+    An async, dictionary-like storage interface, implemented by `IndexedDBStorage` in the browser and by
+    `MemoryStorage` anywhere. Values are serialized with the given serializer (JSON by default), so they keep their
+    types.
+
+    Subclasses implement `_get_many`, `_put_many`, `_delete_many`, `_keys`, `_items` and `_clear`.
+
+    Examples:
+        ``` py
+        cache = IndexedDBStorage("my-app", "products")
+        await cache.put_many({product["id"]: product for product in products})
+        product = await cache.get(product_id)
+        ```
+
+    Attributes:
+        serializer: An object with `dumps(value)` and `loads(text)` methods.
+    """
+
+    NoDefault = BrowserStorage.NoDefault
+
+    def __init__(self, serializer=None):
+        self.serializer = serializer or JsonSerializer()
+
+    async def get(self, key, default=None):
+        """
+        Retrieves the value for a key.
+
+        Args:
+            key (str): The key for the item to retrieve.
+            default: The value to return if the key does not exist.
+
+        Returns:
+            The value associated with the key, or the default value.
+        """
+        values = await self.get_many([key])
+        return values.get(key, default)
+
+    async def get_many(self, keys):
+        """
+        Retrieves the values for several keys at once.
+
+        Args:
+            keys (list): The keys to retrieve.
+
+        Returns:
+            (dict): The keys that exist, and their values.
+        """
+        found = await self._get_many(list(keys))
+        return {key: self.serializer.loads(text) for key, text in found.items()}
+
+    async def set(self, key, value):
+        """
+        Sets the value for a key.
+
+        Args:
+            key (str): The key for the item to set.
+            value: The value to associate with the key.
+        """
+        await self.put_many({key: value})
+
+    async def put_many(self, items):
+        """
+        Sets the values for several keys at once.
+
+        Args:
+            items (dict): The keys and values to set.
+        """
+        await self._put_many({key: self.serializer.dumps(value) for key, value in items.items()})
+
+    async def delete(self, key):
+        """
+        Deletes the item for a key.
+
+        Args:
+            key (str): The key for the item to delete.
+
+        Raises:
+            KeyError: If the key does not exist.
+        """
+        if not await self.contains(key):
+            raise KeyError(key)
+        await self._delete_many([key])
+
+    async def delete_many(self, keys):
+        """
+        Deletes the items for several keys at once. Keys that don't exist are ignored.
+
+        Args:
+            keys (list): The keys to delete.
+        """
+        await self._delete_many(list(keys))
+
+    async def pop(self, key, default=NoDefault):
+        """
+        Removes the item for a key and returns its value.
+
+        Args:
+            key (str): The key for the item to remove.
+            default: The value to return if the key does not exist.
+
+        Returns:
+            The value associated with the key, or the default value.
+
+        Raises:
+            KeyError: If the key does not exist and no default value is provided.
+        """
+        value = await self.get(key, self.NoDefault)
+        if value is self.NoDefault:
+            if default is self.NoDefault:
+                raise KeyError(key)
+            return default
+        await self._delete_many([key])
+        return value
+
+    async def contains(self, key):
+        """
+        Checks if a key exists.
+
+        Args:
+            key (str): The key to check.
+
+        Returns:
+            bool: True if the key exists, False otherwise.
+        """
+        return key in await self._get_many([key])
+
+    async def keys(self):
+        """
+        Returns a list of keys.
+        """
+        return await self._keys()
+
+    async def values(self):
+        """
+        Returns a list of values.
+        """
+        return [value for key, value in await self.items()]
+
+    async def items(self):
+        """
+        Returns a list of (key, value) pairs.
+        """
+        return [(key, self.serializer.loads(text)) for key, text in await self._items()]
+
+    async def count(self):
+        """
+        Returns the number of items.
+        """
+        return len(await self._keys())
+
+    async def clear(self):
+        """
+        Deletes all items.
+        """
+        await self._clear()
+
+    async def _get_many(self, keys):
+        raise NotImplementedError()
+
+    async def _put_many(self, items):
+        raise NotImplementedError()
+
+    async def _delete_many(self, keys):
+        raise NotImplementedError()
+
+    async def _keys(self):
+        raise NotImplementedError()
+
+    async def _items(self):
+        raise NotImplementedError()
+
+    async def _clear(self):
+        raise NotImplementedError()
+
+    def __repr__(self):
+        return f"<{self}>"
+
+
+class MemoryStorage(AsyncStorage):
+    """
+    Keeps items in a dictionary, behind the same async interface as `IndexedDBStorage`. Useful in tests and for code
+    that also runs server side. Values are serialized like they would be by IndexedDBStorage, so stored values can't
+    be changed in place by accident.
+
+    Attributes:
+        data (dict): The serialized items.
+    """
+
+    def __init__(self, serializer=None, description="memory"):
+        super().__init__(serializer)
+        self.description = description
+        self.data = {}
+
+    async def _get_many(self, keys):
+        return {key: self.data[key] for key in keys if key in self.data}
+
+    async def _put_many(self, items):
+        self.data.update(items)
+
+    async def _delete_many(self, keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def _keys(self):
+        return list(self.data.keys())
+
+    async def _items(self):
+        return list(self.data.items())
+
+    async def _clear(self):
+        self.data.clear()
+
+    def __str__(self):
+        return self.description
+
+
+def _destroy_proxy(proxy):
+    destroy = getattr(proxy, "destroy", None)
+    if destroy:
+        destroy()
+
+
+async def _wait_for(target, success_event, *failure_events):
+    # Waits for an IDBRequest or IDBTransaction to finish, without blocking the page. Any of the failure events, eg
+    # a transaction's "onerror" or "onabort", ends the wait with an OSError.
+    done = asyncio.Event()
+    outcome = []
+
+    def on_success(event):
+        outcome.append(None)
+        done.set()
+
+    def failure_handler(event_name):
+        def on_failure(event):
+            outcome.append(f"{event_name[2:]} ({target.error})")
+            done.set()
+
+        return on_failure
+
+    proxies = {success_event: create_proxy(on_success)}
+    for event_name in failure_events:
+        proxies[event_name] = create_proxy(failure_handler(event_name))
+    for event_name, proxy in proxies.items():
+        setattr(target, event_name, proxy)
+    try:
+        await done.wait()
+    finally:
+        for event_name, proxy in proxies.items():
+            setattr(target, event_name, None)
+            _destroy_proxy(proxy)
+
+    if outcome[0] is not None:
+        raise OSError(f"IndexedDB {outcome[0]}")
+
+
+def _close_when_opened(request, upgrade_proxy):
+    # Closes the connection if an abandoned open request succeeds late, so that it doesn't block later upgrades
+    def on_success(event):
+        request.result.close()
+        finish(event)
+
+    def finish(event):
+        request.onsuccess = request.onerror = request.onupgradeneeded = None
+        for proxy in proxies:
+            _destroy_proxy(proxy)
+
+    proxies = [create_proxy(on_success), create_proxy(finish), upgrade_proxy]
+    request.onsuccess, request.onerror = proxies[0], proxies[1]
+
+
+class IndexedDBStorage(AsyncStorage):
+    """
+    Async storage backed by an IndexedDB object store. Unlike `localStorage`, IndexedDB holds far more than a few
+    megabytes and doesn't block the page while it reads and writes, so it suits caching large datasets client-side.
+
+    The database is opened (and the object store created, if needed) the first time it's used. Bulk operations run in
+    a single transaction. Failed or aborted transactions, eg when the storage quota is exceeded, raise `OSError`. If
+    connections in other tabs block an upgrade, opening the database waits for them to close, or until `open_timeout`
+    passes. If another connection upgrades the database, this one is closed, and reopened the next time the storage is
+    used.
+
+    Attributes:
+        database (str): The name of the IndexedDB database.
+        store (str): The name of the object store within the database.
+        open_timeout (float): How many seconds to wait for the database to open before raising `OSError`, or None to
+            wait indefinitely.
+    """
+
+    def __init__(self, database="puepy", store="default", serializer=None, open_timeout=None):
+        """
+        Args:
+            database (str): The name of the IndexedDB database.
+            store (str): The name of the object store within the database. Created if it doesn't exist.
+            serializer: An object with `dumps(value)` and `loads(text)` methods. Defaults to `JsonSerializer()`.
+            open_timeout (float): How many seconds to wait for the database to open, or None to wait indefinitely.
+        """
+        super().__init__(serializer)
+        self.database = database
+        self.store = store
+        self.open_timeout = open_timeout
+        self._db = None
+        self._version_change_proxy = None
+
+    async def _open(self, version=None):
+        from js import indexedDB
+
+        request = indexedDB.open(self.database) if version is None else indexedDB.open(self.database, version)
+
+        def on_upgrade_needed(event):
+            db = request.result
+            if not db.objectStoreNames.contains(self.store):
+                db.createObjectStore(self.store)
+
+        upgrade_proxy = create_proxy(on_upgrade_needed)
+        request.onupgradeneeded = upgrade_proxy
+        # While connections elsewhere, eg in another tab, use an older version of the database, the request is
+        # blocked rather than failed, and succeeds once they close
+        opening = _wait_for(request, "onsuccess", "onerror")
+        timed_out = False
+        try:
+            if self.open_timeout is None:
+                await opening
+            else:
+                await asyncio.wait_for(opening, self.open_timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            raise OSError(f"Timed out opening IndexedDB database {self.database}")
+        finally:
+            if timed_out:
+                _close_when_opened(request, upgrade_proxy)
+            else:
+                request.onupgradeneeded = None
+                _destroy_proxy(upgrade_proxy)
+        return request.result
+
+    async def _get_db(self):
+        if self._db is None:
+            db = await self._open()
+            if not db.objectStoreNames.contains(self.store):
+                # The database exists, but without this store, which can only be added by upgrading it
+                version = db.version + 1
+                db.close()
+                db = await self._open(version)
+            self._db = db
+            self._version_change_proxy = create_proxy(self._on_version_change)
+            db.onversionchange = self._version_change_proxy
+        return self._db
+
+    def _on_version_change(self, event):
+        # Another connection wants to upgrade the database, which it can't do while this one is open
+        self.close()
+
+    async def _object_store(self, mode):
+        db = await self._get_db()
+        transaction = db.transaction(self.store, mode)
+        return transaction, transaction.objectStore(self.store)
+
+    async def _get_many(self, keys):
+        transaction, object_store = await self._object_store("readonly")
+        requests = [(key, object_store.get(key)) for key in keys]
+        await _wait_for(transaction, "oncomplete", "onerror", "onabort")
+
+        found = {}
+        for key, request in requests:
+            if request.result is not None:
+                found[key] = request.result
+        return found
+
+    async def _write(self, operation):
+        transaction, object_store = await self._object_store("readwrite")
+        operation(object_store)
+        await _wait_for(transaction, "oncomplete", "onerror", "onabort")
+
+    async def _put_many(self, items):
+        def put(object_store):
+            for key, text in items.items():
+                object_store.put(text, key)
+
+        await self._write(put)
+
+    async def _delete_many(self, keys):
+        def delete(object_store):
+            for key in keys:
+                object_store.delete(key)
+
+        await self._write(delete)
+
+    async def _keys(self):
+        transaction, object_store = await self._object_store("readonly")
+        request = object_store.getAllKeys()
+        await _wait_for(transaction, "oncomplete", "onerror", "onabort")
+        return list(request.result)
+
+    async def _items(self):
+        transaction, object_store = await self._object_store("readonly")
+        keys_request = object_store.getAllKeys()
+        values_request = object_store.getAll()
+        await _wait_for(transaction, "oncomplete", "onerror", "onabort")
+        return list(zip(keys_request.result, values_request.result))
+
+    async def _clear(self):
+        await self._write(lambda object_store: object_store.clear())
+
+    async def count(self):
+        """
+        Returns the number of items.
+        """
+        transaction, object_store = await self._object_store("readonly")
+        request = object_store.count()
+        await _wait_for(transaction, "oncomplete", "onerror", "onabort")
+        return request.result
+
+    def close(self):
+        """
+        Closes the database connection. It's reopened if the storage is used again.
+        """
+        if self._db is not None:
+            self._db.onversionchange = None
+            self._db.close()
+            self._db = None
+            _destroy_proxy(self._version_change_proxy)
+            self._version_change_proxy = None
+
+    def __str__(self):
+        return f"IndexedDB {self.database}/{self.store}"
@@ -0,0 +1,184 @@
+"""
+Lightweight instrumentation for finding out where time goes when PuePy navigates, mounts and redraws pages.
+
+Example:
+    ``` py
+    from puepy import Application
+    from puepy.timing import Timings
+
+    app = Application(timings=Timings(size=500, performance_marks=True))
+    ...
+    for timing in app.timings.entries():
+        print(timing)
+    ```
+
+Classes:
+    Timing: A single measured phase, such as a page's `populate` or a route match
+    Timings: Records timings into an in-memory ring buffer and notifies listeners about each one
+"""
+
+from .reactivity import Listener
+from .runtime import is_server_side
+from .util import jsobj
+
+if is_server_side:
+    from time import perf_counter
+
+    def now():
+        return perf_counter() * 1000
+
+else:
+    from js import performance
+
+    def now():
+        return performance.now()
+
+
+class Timing:
+    """
+    A single measured phase.
+
+    Attributes:
+        name (str): The phase, eg "route_match", "prop_coercion", "precheck", "populate", "render", "patch",
+            "on_ready", "css", "mount", "redraw" or "navigation".
+        target (str): What was being measured, usually the tag, component or page, or the path being navigated to.
+        start (float): When the phase started, in milliseconds.
+        duration (float): How long the phase took, in milliseconds.
+    """
+
+    def __init__(self, name, target, start, duration):
+        self.name = name
+        self.target = target
+        self.start = start
+        self.duration = duration
+
+    def __str__(self):
+        return f"{self.name} {self.target}: {self.duration:.2f}ms"
+
+    def __repr__(self):
+        return f"<Timing: {self}>"
+
+
+class _Measurement:
+    def __init__(self, timings, name, target):
+        self.timings = timings
+        self.name = name
+        self.target = target
+
+    def __enter__(self):
+        self.start = now()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.timings.record(self.name, self.target, self.start, now())
+        return False
+
+
+class Timings:
+    """
+    Records timings into an in-memory ring buffer. Pass an instance to `Application(timings=...)` to instrument the
+    application's navigation, mounting and redrawing.
+
+    Attributes:
+        size (int): How many timings are kept. Older ones are discarded.
+        performance_marks (bool): Whether to also create `performance.measure` entries in the browser, so timings
+            show up in the browser's developer tools.
+        listener (Listener): Notified with each `Timing` as it's recorded, for sending timings elsewhere.
+    """
+
+    def __init__(self, size=200, performance_marks=False):
+        if size < 1:
+            raise ValueError(f"Timings size must be at least 1, not {size}")
+        self.size = size
+        self.performance_marks = performance_marks and not is_server_side
+        self.listener = Listener()
+        self._entries = []
+        self._position = 0
+
+    def measure(self, name, target=None):
+        """
+        Returns a context manager that records how long its block took.
+
+        Args:
+            name (str): The name of the phase being measured.
+            target: What is being measured, eg, a Tag or a path.
+
+        Examples:
+            ``` py
+            with timings.measure("populate", page):
+                page.populate()
+            ```
+        """
+        return _Measurement(self, name, target)
+
+    def record(self, name, target, start, end):
+        """
+        Records a timing.
+
+        Args:
+            name (str): The name of the phase measured.
+            target: What was measured.
+            start (float): Start time, in milliseconds.
+            end (float): End time, in milliseconds.
+        """
+        timing = Timing(name, str(target) if target is not None else "", start, end - start)
+
+        if len(self._entries) < self.size:
+            self._entries.append(timing)
+        else:
+            self._entries[self._position] = timing
+        self._position = (self._position + 1) % self.size
+
+        if self.performance_marks:
+            performance.measure(f"puepy:{name} {timing.target}", jsobj(start=start, end=end))
+
+        self.listener.notify(timing)
+
+    def entries(self):
+        """
+        Returns the recorded timings, oldest first.
+
+        Returns:
+            (list): A list of `Timing` objects
+        """
+        if len(self._entries) < self.size:
+            return self._entries[:]
+        return self._entries[self._position :] + self._entries[: self._position]
+
+    def clear(self):
+        """
+        Discards all recorded timings.
+        """
+        self._entries = []
+        self._position = 0
+
+    def __str__(self):
+        return f"Timings ({len(self._entries)} of {self.size})"
+
+    def __repr__(self):
+        return f"<{self}>"
+
+
+class _NullMeasurement:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class _NullTimings:
+    """
+    Stands in for `Timings` when instrumentation is off, so measured code doesn't need to check.
+    """
+
+    _measurement = _NullMeasurement()
+
+    def measure(self, name, target=None):
+        return self._measurement
+
+    def __bool__(self):
+        return False
+
+
+no_timings = _NullTimings()
@@ -8,6 +8,17 @@ except ImportError:
         return obj
 
 
+def stable_hash(text):
+    """
+    Returns a 64-bit hash of the given string that is the same on every run and on every runtime, unlike `hash()`.
+    """
+    # 64-bit FNV-1a, in pure Python so that every runtime gives the same result, with or without hashlib
+    result = 0xCBF29CE484222325
+    for byte in text.encode("utf-8"):
+        result = ((result ^ byte) * 0x100000001B3) & 0xFFFFFFFFFFFFFFFF
+    return result
+
+
 def mixed_to_underscores(input_string, separator="_"):
     result = []
     for index, char in enumerate(input_string):
@@ -17,9 +28,78 @@ def mixed_to_underscores(input_string, separator="_"):
     return "".join(result)
 
 
+def import_object(path):
+    """
+    Imports and returns an object given its import path, such as `"myapp.widgets:DatePicker"` or
+    `"myapp.widgets.DatePicker"`.
+
+    Args:
+        path (str): The module path and the object's name, separated by a colon or a dot.
+
+    Returns:
+        The imported object
+    """
+    if ":" in path:
+        module_path, name = path.split(":", 1)
+    else:
+        module_path, _, name = path.rpartition(".")
+
+    # __import__ returns the top level package, so walk down to the module itself
+    module = __import__(module_path)
+    for part in module_path.split(".")[1:]:
+        module = getattr(module, part)
+    return getattr(module, name)
+
+
+MERGE_CLASSES_CACHE_SIZE = 512
+_merge_classes_cache = {}
+
+
+def _class_option_key(class_option, css_class_type):
+    if class_option is None or isinstance(class_option, (str, tuple, frozenset)):
+        return class_option
+    elif isinstance(class_option, list):
+        return tuple(class_option)
+    elif isinstance(class_option, set):
+        return frozenset(class_option)
+    elif isinstance(class_option, dict):
+        return dict, tuple((key, bool(value)) for key, value in class_option.items())
+    elif isinstance(class_option, css_class_type):
+        return class_option
+    raise TypeError(f"Can't memoize class option {class_option!r}")
+
+
 def merge_classes(*items):
+    """
+    Merges class options (strings, lists, sets, dicts and CssClass instances) into a set of class names, dropping any
+    excluded with a "/" prefix or a False dict value.
+
+    Results are memoized on the options' contents, since the same options tend to be merged on every render.
+
+    Returns:
+        (tuple): A set of class names, and a list of the CssClass instances used.
+    """
     from .core import CssClass
 
+    try:
+        cache_key = tuple(_class_option_key(class_option, CssClass) for class_option in items)
+        cached = _merge_classes_cache.get(cache_key)
+    except TypeError:
+        # Unhashable options can't be memoized
+        cache_key = cached = None
+
+    if cached is None:
+        classes, python_css_classes = _merge_classes(items, CssClass)
+        if cache_key is not None:
+            if len(_merge_classes_cache) >= MERGE_CLASSES_CACHE_SIZE:
+                _merge_classes_cache.clear()
+            _merge_classes_cache[cache_key] = frozenset(classes), tuple(python_css_classes)
+        return classes, python_css_classes
+
+    return set(cached[0]), list(cached[1])
+
+
+def _merge_classes(items, CssClass):
     classes = set()
     python_css_classes = []
     exclude_classes = set()
@@ -75,7 +155,7 @@ def get_attributes(element):
         return [a.name for a in element.attributes]
 
 
-def patch_dom_element(source_element, target_element):
+def patch_dom_element(source_element, target_element, match_ids=True):
     """
     This method patches the target DOM element with attributes and children from the source DOM element. It follows
     the following steps:
@@ -87,10 +167,15 @@ def patch_dom_element(source_element, target_element):
     :param source_element: The source DOM element that contains the attributes and children to patch.
     :param target_element: The target DOM element that will be patched with the attributes and children from the source
     element.
+    :param match_ids: If True (default), morphdom pairs elements by their id attribute. If False, elements are paired by
+    position and tag name only, so nodes whose id changed are patched in place rather than replaced.
     """
     # Use morphdom on the client side
     if morphdom:
-        return morphdom.default(target_element, source_element)
+        if match_ids:
+            return morphdom.default(target_element, source_element)
+        else:
+            return morphdom.default(target_element, source_element, _morphdom_unkeyed_options())
 
     # Remove attributes that don't exist in source element
     for attribute in get_attributes(target_element):
@@ -128,6 +213,28 @@ def patch_dom_element(source_element, target_element):
             target_element.removeChild(target_child)
 
 
+def patch_keeps_elements():
+    """
+    Whether patch_dom_element (pairing elements by id) keeps existing elements in place, so elements looked up before
+    a patch are still the live ones afterwards. True when morphdom is available; the fallback patches by position, which
+    can move an id from one element to another.
+    """
+    return morphdom is not None
+
+
+_morphdom_unkeyed = None
+
+
+def _morphdom_unkeyed_options():
+    global _morphdom_unkeyed
+    if _morphdom_unkeyed is None:
+        from js import Function
+
+        # A plain JS function, so morphdom doesn't call back into Python for every node
+        _morphdom_unkeyed = jsobj(getNodeKey=Function.new("node", "return null"))
+    return _morphdom_unkeyed
+
+
 # Import morphdom if available
 morphdom = None
 if not is_server_side:
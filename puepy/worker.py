@@ -0,0 +1,109 @@
+"""
+Runs expensive Python code in a PyScript worker, so it doesn't freeze the page while it runs. The application, its
+pages and their state stay on the main thread, next to the DOM they draw; only the heavy lifting is sent to the worker.
+
+In the worker's script, decorate the functions to offer and export them:
+
+``` py
+# analysis.py, loaded with <script type="py" worker name="analysis" src="./analysis.py" config="pyscript.json">
+from puepy.worker import worker_function
+
+
+@worker_function
+def summarize(rows):
+    ...
+
+
+__export__ = ["summarize"]
+```
+
+Then, on the main thread:
+
+``` py
+summary = await run_in_worker("analysis", "summarize", rows)
+```
+
+Arguments and results are sent as JSON, so they should be JSON serializable. Server side, where there are no workers,
+decorated functions are called in-process, through the same JSON encoding.
+
+The application itself isn't run in a worker: rendering, patching and event handling stay on the main thread, so only
+code called through `run_in_worker` is moved off it.
+
+Functions:
+    worker_function: Decorates a function in a worker script so it can be called with `run_in_worker`
+    run_in_worker: Calls a function in a named worker and awaits its result
+    get_worker: Returns a named worker, once it's ready
+"""
+
+import json
+
+from .runtime import is_server_side
+
+_local_functions = {}
+_workers = {}
+
+
+def worker_function(func):
+    """
+    Decorates a function in a worker script, so it can be called with `run_in_worker`. The function may be sync or
+    async. The decorated function takes and returns JSON, so it should be called through `run_in_worker`, rather than
+    directly.
+
+    Args:
+        func (callable): The function to offer.
+
+    Returns:
+        (callable): The function to export from the worker
+    """
+
+    async def exported(payload):
+        args, kwargs = json.loads(payload)
+        result = func(*args, **kwargs)
+        if hasattr(result, "send"):
+            # An async function (or, in MicroPython, any generator)
+            result = await result
+        return json.dumps(result)
+
+    _local_functions[func.__name__] = exported
+    return exported
+
+
+async def get_worker(name):
+    """
+    Returns a named PyScript worker, waiting for it to be ready the first time.
+
+    Args:
+        name (str): The worker's name, from its script tag's `name` attribute.
+
+    Returns:
+        The worker, whose attributes are its exported functions
+    """
+    if name not in _workers:
+        from pyscript import workers
+
+        _workers[name] = await workers[name]
+    return _workers[name]
+
+
+async def run_in_worker(worker_name, function_name, *args, **kwargs):
+    """
+    Calls a function (decorated with `worker_function`) in a named worker and awaits its result.
+
+    Args:
+        worker_name (str): The worker's name, from its script tag's `name` attribute.
+        function_name (str): The name the function is exported as.
+        *args: Positional arguments, which must be JSON serializable.
+        **kwargs: Keyword arguments, which must be JSON serializable.
+
+    Returns:
+        The function's result, decoded from JSON
+    """
+    payload = json.dumps([args, kwargs])
+    if is_server_side:
+        if function_name not in _local_functions:
+            raise ValueError(f"No worker function named {function_name}")
+        result = await _local_functions[function_name](payload)
+    else:
+        worker = await get_worker(worker_name)
+        result = await getattr(worker, function_name)(payload)
+    return json.loads(result)
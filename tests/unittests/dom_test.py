@@ -28,3 +28,21 @@ class DomTest(unittest.TestCase):
         for child in element.childNodes:
             if child.nodeType == Node.ELEMENT_NODE:
                 self.remove_ids_from_elements(child)
+
+    def register_component(self, component):
+        """
+        Registers a component on the global builder for the rest of the test, restoring the previous registrations
+        afterwards.
+        """
+        registered, lazy = dict(core.t.components), dict(core.t.lazy_components)
+
+        def restore():
+            core.t.components.clear()
+            core.t.components.update(registered)
+            core.t.lazy_components.clear()
+            core.t.lazy_components.update(lazy)
+            core.t._clear_factories()
+
+        self.addCleanup(restore)
+        core.t.add_component(component)
+        return component
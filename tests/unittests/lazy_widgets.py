@@ -0,0 +1,10 @@
+# Imported lazily by TestLazyComponents, so it mustn't be imported anywhere else
+from puepy.core import Component, t
+
+
+class Badge(Component):
+    enclosing_tag = "span"
+    props = ["label"]
+
+    def populate(self):
+        t(self.label)
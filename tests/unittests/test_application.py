@@ -1,11 +1,12 @@
+import asyncio
 import unittest
 from unittest.mock import Mock, patch
 
 from .dom_test import DomTest
 from puepy.application import Application
-from puepy.exceptions import Redirect, Unauthorized, Forbidden
+from puepy.exceptions import Redirect, Unauthorized, Forbidden, NotFound, PropsError
 from puepy.router import Router
-from puepy.core import Page, t
+from puepy.core import Page, Prop, t
 
 
 class TestApplication(DomTest):
@@ -64,6 +65,19 @@ class TestApplication(DomTest):
         self.app.mount(self.html, path="/login")
         self.assertIn("Login Page", self.html.toxml())
 
+    def test_navigation_patches_previous_page(self):
+        self.app.mount(self.html, path="/")
+        page_element = self.html.firstChild
+        main_page = self.app.active_page
+
+        self.app.mount(self.html, path="/login")
+        self.assertIs(self.html.firstChild, page_element)
+        self.assertEqual(len(self.html.childNodes), 1)
+        self.assertIn("Login Page", self.html.toxml())
+        self.assertNotIn("Main Page", self.html.toxml())
+        self.assertEqual(page_element.getAttribute("id"), self.app.active_page.element_id)
+        self.assertFalse(main_page._added_event_listeners)
+
     def test_error_page_defaults(self):
         with self.assertRaises(ValueError):
             self.app.mount(self.html, path="/cause-programming-error")
@@ -90,5 +104,141 @@ class TestApplication(DomTest):
         self.assertIsInstance(self.app.active_page, self.app.not_found_page)
 
 
+class TestPageProps(DomTest):
+    def setUp(self):
+        super().setUp()
+
+        self.app = Application()
+        self.app.install_router(Router)
+
+        @self.app.page("/items/<item_id>")
+        class ItemPage(Page):
+            props = [
+                Prop("item_id", type=int),
+                Prop("offset", type=int, default_value=0),
+                Prop("expanded", type=bool, default_value=False),
+                Prop("tag", type=list, default_value=[]),
+            ]
+
+        self.item_page_class = ItemPage
+
+    def test_props_coerced_from_url(self):
+        page = self.app.mount(self.html, path="/items/5?offset=20&expanded=true&tag=a&tag=b")
+        self.assertIsInstance(page, self.item_page_class)
+        self.assertEqual(page.item_id, 5)
+        self.assertEqual(page.offset, 20)
+        self.assertIs(page.expanded, True)
+        self.assertEqual(page.tag, ["a", "b"])
+
+    def test_defaults(self):
+        page = self.app.mount(self.html, path="/items/5")
+        self.assertEqual(page.offset, 0)
+        self.assertIs(page.expanded, False)
+
+    def test_bad_value_not_found(self):
+        self.app.mount(self.html, path="/items/abc")
+        self.assertIsInstance(self.app.active_page, self.app.not_found_page)
+
+
+class TestLoaders(DomTest):
+    def setUp(self):
+        super().setUp()
+
+        self.app = Application()
+        self.app.install_router(Router)
+        self.calls = []
+
+        async def load_user(application, user_id, **kwargs):
+            self.calls.append(("user", user_id))
+            if user_id == "missing":
+                raise NotFound()
+            return {"name": f"User {user_id}"}
+
+        async def load_posts(application, user_id, **kwargs):
+            self.calls.append(("posts", user_id))
+            return ["Post 1", "Post 2"]
+
+        class LayoutPage(Page):
+            loaders = {"user": load_user}
+
+        @self.app.page("/users/<user_id>", loaders={"posts": load_posts})
+        class UserPage(LayoutPage):
+            props = ["user_id", "user", "posts"]
+            loader_ttl = 60
+
+            def populate(self):
+                t.h1(self.user["name"])
+                for post in self.posts:
+                    t.p(post)
+
+        @self.app.page("/bad")
+        class BadPage(Page):
+            loaders = {"undeclared": load_posts}
+
+        self.user_page_class = UserPage
+
+    def test_loaders_feed_props(self):
+        page = self.app.mount(self.html, path="/users/5")
+        self.assertIsInstance(page, self.user_page_class)
+        self.assertEqual(page.user, {"name": "User 5"})
+        self.remove_ids_from_elements(self.html)
+        self.assertIn("<h1>User 5</h1><p>Post 1</p><p>Post 2</p>", self.html.toxml())
+        self.assertEqual(sorted(self.calls), [("posts", "5"), ("user", "5")])
+
+    def test_loader_results_cached_by_arguments(self):
+        self.app.mount(self.html, path="/users/5")
+        self.app.mount(self.html, path="/users/5")
+        self.assertEqual(len(self.calls), 2)
+
+        self.app.mount(self.html, path="/users/6")
+        self.assertEqual(len(self.calls), 4)
+
+    def test_loader_page_error(self):
+        self.app.mount(self.html, path="/users/missing")
+        self.assertIsInstance(self.app.active_page, self.app.not_found_page)
+
+    def test_loader_must_be_prop(self):
+        with self.assertRaises(PropsError):
+            self.app.mount(self.html, path="/bad")
+
+
+class TestLoadersInEventLoop(DomTest, unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.app = Application()
+        self.app.install_router(Router)
+
+        async def load_user(application, user_id, **kwargs):
+            await asyncio.sleep(0)
+            return {"name": f"User {user_id}"}
+
+        @self.app.page("/users/<user_id>")
+        class UserPage(Page):
+            props = ["user_id", "user"]
+            loaders = {"user": load_user}
+
+            def populate(self):
+                t.h1(self.user["name"])
+
+        self.user_page_class = UserPage
+
+    async def test_mount_schedules_loaders(self):
+        self.assertIsNone(self.app.mount(self.html, path="/users/5"))
+        self.assertIsNone(self.app.active_page)
+
+        for _ in range(5):
+            await asyncio.sleep(0)
+        self.assertIsInstance(self.app.active_page, self.user_page_class)
+        self.assertEqual(self.app.active_page.user, {"name": "User 5"})
+
+    async def test_mount_async(self):
+        page = await self.app.mount_async(self.html, path="/users/6")
+        self.assertIsInstance(page, self.user_page_class)
+        self.assertIs(self.app.active_page, page)
+        self.remove_ids_from_elements(self.html)
+        self.assertIn("<h1>User 6</h1>", self.html.toxml())
+
+
 if __name__ == "__main__":
     unittest.main()
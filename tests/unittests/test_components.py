@@ -0,0 +1,329 @@
+import asyncio
+import time
+import unittest
+
+import pytest
+
+from .dom_test import DomTest
+from puepy import components
+from puepy.components import AsyncComponent, RequestCache
+from puepy.core import Page, t
+
+
+@pytest.fixture(autouse=True, scope="module")
+def component_library():
+    registered, lazy = dict(t.components), dict(t.lazy_components)
+    t.add_library(components)
+    yield
+    t.components.clear()
+    t.components.update(registered)
+    t.lazy_components.clear()
+    t.lazy_components.update(lazy)
+    t._clear_factories()
+
+
+class FakeScrollTarget:
+    def __init__(self, scroll_top):
+        self.scrollTop = scroll_top
+
+
+class FakeScrollEvent:
+    def __init__(self, scroll_top):
+        self.target = FakeScrollTarget(scroll_top)
+
+
+class TestVirtualList(DomTest):
+    def setUp(self):
+        super().setUp()
+
+        class ListPage(Page):
+            def populate(self):
+                self.list = t.virtual_list(
+                    row_count=50000,
+                    row_height=20,
+                    height=200,
+                    overscan=5,
+                    populate_row=lambda index: t.div(f"Row {index}"),
+                )
+
+        self.page = ListPage()
+        self.page.mount(self.html)
+        self.list = self.page.list
+
+    def rows(self):
+        return self.list.refs["rows"].children
+
+    def test_only_visible_rows_rendered(self):
+        self.assertEqual(len(self.rows()), 20)
+        self.assertEqual(self.rows()[0].children, ["Row 0"])
+        self.assertEqual(len(self.html.getElementsByTagName("div")), 20 + 4)
+
+        spacer = self.list.refs["spacer"].element
+        self.assertEqual(spacer.getAttribute("style"), "height: 1000000px")
+
+    def test_rows_recycled_on_scroll(self):
+        tags = list(self.rows())
+
+        self.list.on_scroll(FakeScrollEvent(20 * 1000))
+        self.assertEqual(self.list.state["first_row"], 995)
+        self.assertEqual([tag.children[0] for tag in self.rows()][:2], ["Row 995", "Row 996"])
+        self.assertEqual(self.rows(), tags)
+        self.assertEqual(len(self.html.getElementsByTagName("div")), 20 + 4)
+        self.assertIn("Row 995", self.html.toxml())
+
+    def test_end_of_list(self):
+        self.list.on_scroll(FakeScrollEvent(20 * 60000))
+        self.assertEqual(self.rows()[-1].children, ["Row 49999"])
+        self.assertEqual(self.rows()[0].children, ["Row 49985"])
+        self.assertEqual(len(self.rows()), 15)
+
+
+class TestVirtualTable(DomTest):
+    def test_spacer_rows(self):
+        class TablePage(Page):
+            def populate(self):
+                self.table = t.virtual_table(
+                    row_count=1000,
+                    row_height=10,
+                    height=100,
+                    overscan=0,
+                    populate_header=lambda: t.tr(t.th("Name")),
+                    populate_row=lambda index: t.tr(t.td(f"Row {index}")),
+                )
+
+        page = TablePage()
+        page.mount(self.html)
+        page.table.on_scroll(FakeScrollEvent(500))
+
+        rows = self.html.getElementsByTagName("tbody")[0].getElementsByTagName("tr")
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(rows[0].getAttribute("style"), "height: 500px")
+        self.assertEqual(rows[-1].getAttribute("style"), "height: 9400px")
+        self.assertEqual(len(self.html.getElementsByTagName("th")), 1)
+
+
+class TestLazy(DomTest):
+    def setUp(self):
+        super().setUp()
+        self.populated = []
+        populated = self.populated
+
+        class FeedPage(Page):
+            def populate(self):
+                self.items = [
+                    t.lazy(
+                        placeholder_height=50,
+                        unload_margin="1000px",
+                        populate_content=lambda i=i: (populated.append(i), t.p(f"Item {i}")),
+                    )
+                    for i in range(3)
+                ]
+
+        self.page = FeedPage()
+        self.page.mount(self.html)
+
+    def test_placeholders_first(self):
+        self.assertEqual(self.populated, [])
+        self.assertEqual(len(self.html.getElementsByTagName("p")), 0)
+        placeholder = self.page.items[0].refs["placeholder"].element
+        self.assertEqual(placeholder.getAttribute("style"), "height: 50px")
+
+    def test_loaded_when_visible(self):
+        self.page.items[1].on_intersection("200px", True)
+        self.assertEqual(self.populated, [1])
+        self.assertIn("Item 1", self.html.toxml())
+        self.assertNotIn("Item 0", self.html.toxml())
+
+        # Leaving the load margin doesn't unload it; leaving the unload margin does
+        self.page.items[1].on_intersection("200px", False)
+        self.assertIn("Item 1", self.html.toxml())
+        self.page.items[1].on_intersection("1000px", False)
+        self.assertNotIn("Item 1", self.html.toxml())
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestAsyncComponent(DomTest, unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        super().setUp()
+        self.calls = []
+        self.release = asyncio.Event()
+        self.cache = RequestCache()
+
+        calls, release, cache = self.calls, self.release, self.cache
+
+        async def fetch_user(user_id):
+            calls.append(user_id)
+            await release.wait()
+            if user_id == "missing":
+                raise KeyError(user_id)
+            return {"name": f"User {user_id}"}
+
+        class UserCard(AsyncComponent):
+            props = ["user_id"]
+
+            async def load(self):
+                return await cache.request(fetch_user, self.user_id)
+
+            def populate_fallback(self):
+                t.span("Loading")
+
+            def populate_error(self, error):
+                t.span(f"Failed: {error!r}")
+
+            def populate(self):
+                t.span(self.state["data"]["name"])
+
+        class UsersPage(Page):
+            def initial(self):
+                return {"user_id": "1"}
+
+            def populate(self):
+                self.first = t.user_card(user_id=self.state["user_id"])
+                self.second = t.user_card(user_id="1")
+
+        t.add_component(UserCard)
+        self.page = UsersPage()
+
+    async def test_fallback_then_data(self):
+        self.page.mount(self.html)
+        self.assertEqual(self.html.toxml().count("Loading"), 2)
+        self.assertTrue(self.page.first.loading)
+
+        self.release.set()
+        await settle()
+        self.assertFalse(self.page.first.loading)
+        self.assertEqual(self.html.toxml().count("User 1"), 2)
+        self.assertNotIn("Loading", self.html.toxml())
+
+    async def test_concurrent_requests_shared(self):
+        self.page.mount(self.html)
+        await settle()
+        self.assertEqual(self.calls, ["1"])
+
+        self.release.set()
+        await settle()
+        self.assertEqual(self.page.second.state["data"], {"name": "User 1"})
+
+    async def test_prop_change_reloads(self):
+        self.page.mount(self.html)
+        await settle()
+        self.release.set()
+        await settle()
+
+        self.page.state["user_id"] = "2"
+        self.assertTrue(self.page.first.loading)
+        self.assertFalse(self.page.second.loading)
+        await settle()
+        self.assertEqual(self.calls, ["1", "2"])
+        self.assertIn("User 2", self.html.toxml())
+
+    async def test_error(self):
+        self.page.state["user_id"] = "missing"
+        self.page.mount(self.html)
+        self.release.set()
+        await settle()
+        self.assertIn("Failed: KeyError", self.html.toxml())
+        self.assertIn("User 1", self.html.toxml())
+
+
+class TestAsyncComponentWithoutLoop(DomTest):
+    def test_fallback_drawn(self):
+        class Slow(AsyncComponent):
+            async def load(self):
+                return "data"
+
+            def populate_fallback(self):
+                t.span("Loading")
+
+        class SlowPage(Page):
+            def populate(self):
+                self.slow = t.slow()
+
+        t.add_component(Slow)
+        page = SlowPage()
+        page.mount(self.html)
+        self.assertIn("Loading", self.html.toxml())
+        self.assertTrue(page.slow.loading)
+
+
+class TestRequestCache(unittest.IsolatedAsyncioTestCase):
+    async def test_in_flight_shared(self):
+        calls = []
+
+        async def fetch(value, scale=1):
+            calls.append(value)
+            await asyncio.sleep(0)
+            return value * scale
+
+        cache = RequestCache()
+        results = await asyncio.gather(
+            cache.request(fetch, 2), cache.request(fetch, 2), cache.request(fetch, 2, scale=3)
+        )
+        self.assertEqual(results, [2, 2, 6])
+        self.assertEqual(calls, [2, 2])
+
+        # Without a ttl, nothing is kept once the request completes
+        await cache.request(fetch, 2)
+        self.assertEqual(len(calls), 3)
+
+    async def test_ttl_and_invalidate(self):
+        calls = []
+
+        async def fetch(value):
+            calls.append(value)
+            return value
+
+        cache = RequestCache(ttl=60)
+        await cache.request(fetch, 1)
+        await cache.request(fetch, 1)
+        self.assertEqual(calls, [1])
+
+        cache.invalidate(fetch, 1)
+        await cache.request(fetch, 1)
+        self.assertEqual(calls, [1, 1])
+
+    async def test_errors_shared(self):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0)
+            raise ValueError("nope")
+
+        cache = RequestCache()
+        results = await asyncio.gather(cache.request(fetch), cache.request(fetch), return_exceptions=True)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+    async def test_unhashable_arguments_not_shared(self):
+        async def fetch(values):
+            return sum(values)
+
+        self.assertEqual(await RequestCache().request(fetch, [1, 2]), 3)
+
+    async def test_results_bounded(self):
+        async def fetch(value):
+            return value
+
+        cache = RequestCache(ttl=60, max_size=3)
+        for value in range(3):
+            await cache.request(fetch, value)
+        self.assertEqual(len(cache._results), 3)
+
+        await cache.request(fetch, 3)
+        self.assertEqual(len(cache._results), 1)
+
+    async def test_expired_results_pruned(self):
+        async def fetch(value):
+            return value
+
+        cache = RequestCache(ttl=60)
+        await cache.request(fetch, 1)
+        cache._results[cache._key(fetch, (1,), {})] = (time.time() - 1, 1)
+
+        await cache.request(fetch, 2)
+        self.assertEqual(list(cache._results), [cache._key(fetch, (2,), {})])
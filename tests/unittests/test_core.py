@@ -1,3 +1,4 @@
+import sys
 import unittest
 from unittest.mock import MagicMock
 
@@ -124,6 +125,649 @@ class TestIntegration(DomTest):
         )
 
 
+class TestAutoRefs(DomTest):
+    def setUp(self):
+        super().setUp()
+        t = core.t
+
+        class DeepPage(core.Page):
+            def initial(self):
+                return {"depth": 30}
+
+            def populate(self):
+                self.nest(self.state["depth"])
+
+            def nest(self, depth):
+                if depth:
+                    with t.div():
+                        self.nest(depth - 1)
+                else:
+                    self.innermost = t.span("Deep")
+
+        self.page = DeepPage()
+        self.page.mount(self.html)
+
+    def test_refs_compact(self):
+        self.assertLess(len(self.page.innermost.ref), 20)
+        self.assertEqual(len(self.page.refs), 31)
+
+    def test_tags_reused_on_redraw(self):
+        innermost = self.page.innermost
+        self.page.redraw()
+        self.assertIs(self.page.innermost, innermost)
+
+    def test_removed_parents_forgotten(self):
+        self.page.state["depth"] = 10
+        self.assertEqual(len(self.page._auto_ref_ids), 11)
+
+
+class TestBuilderFactories(DomTest):
+    def setUp(self):
+        super().setUp()
+        self.builder = builder = core.Builder()
+
+        class ListPage(core.Page):
+            def populate(self):
+                with builder.ul():
+                    builder.list_item("One")
+                    builder.list_item("Two")
+
+        self.ListPage = ListPage
+
+    def test_factories_cached(self):
+        self.assertIs(self.builder.td, self.builder.td)
+        self.assertIn("td", self.builder.__dict__)
+
+        page = self.ListPage()
+        page.mount(self.html)
+        self.assertEqual(len(self.html.getElementsByTagName("list-item")), 2)
+
+    def test_component_registration_invalidates(self):
+        self.ListPage().mount(self.html)
+        self.assertIn("list_item", self.builder.__dict__)
+
+        class ListItem(core.Component):
+            enclosing_tag = "li"
+
+        self.builder.add_component(ListItem)
+        self.assertNotIn("list_item", self.builder.__dict__)
+
+        page = self.ListPage()
+        page.mount(self.html)
+        self.assertEqual([type(tag) for tag in page.children[0].children], [ListItem, ListItem])
+
+    def test_private_names(self):
+        with self.assertRaises(AttributeError):
+            self.builder._missing
+
+
+class TestLazyComponents(DomTest):
+    def setUp(self):
+        super().setUp()
+        self.builder = builder = core.Builder()
+        self.module_name = f"{__package__}.lazy_widgets"
+        sys.modules.pop(self.module_name, None)
+
+        builder.add_lazy_library({"status_badge": f"{self.module_name}:Badge"})
+
+        class BadgePage(core.Page):
+            def populate(self):
+                builder.status_badge(label="New")
+
+        self.BadgePage = BadgePage
+
+    def test_imported_on_first_use(self):
+        self.assertNotIn(self.module_name, sys.modules)
+        self.assertIn("status-badge", self.builder.lazy_components)
+
+        page = self.BadgePage()
+        page.mount(self.html)
+
+        self.assertIn(self.module_name, sys.modules)
+        badge_class = sys.modules[self.module_name].Badge
+        self.assertIs(self.builder.components["status-badge"], badge_class)
+        self.assertEqual(self.builder.lazy_components, {})
+        self.assertIsInstance(page.children[0], badge_class)
+        self.assertIn("New</span>", self.html.toxml())
+
+    def test_add_component_replaces_lazy(self):
+        class StatusBadge(core.Component):
+            pass
+
+        self.builder.add_component(StatusBadge)
+        self.assertEqual(self.builder.lazy_components, {})
+        self.BadgePage().mount(self.html)
+        self.assertNotIn(self.module_name, sys.modules)
+
+
+class TestEventListenerLifecycle(DomTest):
+    def setUp(self):
+        super().setUp()
+        t = core.t
+
+        class ListenerPage(core.Page):
+            def initial(self):
+                return {"text": ""}
+
+            def populate(self):
+                t.button("Bound", ref="bound", on_click=self.on_click)
+                t.button("Lambda", ref="lambda", on_click=lambda e: None)
+                t.input(ref="input", bind="text")
+                t.p("Plain", ref="plain")
+
+            def on_click(self, event):
+                pass
+
+        self.page = ListenerPage()
+        self.page.mount(self.html)
+
+    def test_listeners_on_live_elements(self):
+        for ref in ("bound", "lambda", "input"):
+            tag = self.page.refs[ref]
+            self.assertEqual(len(tag._added_event_listeners), 1)
+            self.assertIs(tag._added_event_listeners[0][0], tag.element)
+
+    def test_redraw_does_not_accumulate(self):
+        bound_entry = self.page.refs["bound"]._added_event_listeners[0]
+        lambda_entry = self.page.refs["lambda"]._added_event_listeners[0]
+
+        for _ in range(3):
+            self.page.redraw()
+
+        for ref in ("bound", "lambda", "input"):
+            tag = self.page.refs[ref]
+            self.assertEqual(len(tag._added_event_listeners), 1)
+            self.assertIs(tag._added_event_listeners[0][0], tag.element)
+            self.assertFalse(tag._pending_event_listeners)
+
+        # Unchanged listeners are left in place; new ones replace stale ones
+        self.assertIs(self.page.refs["bound"]._added_event_listeners[0], bound_entry)
+        self.assertIsNot(self.page.refs["lambda"]._added_event_listeners[0], lambda_entry)
+
+    def test_redraw_skips_tags_without_listeners(self):
+        element_is_live = MagicMock(wraps=core._element_is_live)
+        original = core._element_is_live
+        core._element_is_live = element_is_live
+        try:
+            self.page.redraw()
+        finally:
+            core._element_is_live = original
+
+        # Only tags with listeners to reconcile need their live element
+        checked = {call.args[1] for call in element_is_live.call_args_list}
+        self.assertEqual(checked, {self.page.refs[ref].element_id for ref in ("bound", "lambda", "input")})
+        self.assertIsNone(self.page.refs["plain"]._added_event_listeners)
+
+
+class TestElementCache(DomTest):
+    def setUp(self):
+        super().setUp()
+        t = core.t
+
+        class CachePage(core.Page):
+            def initial(self):
+                return {"show": True}
+
+            def populate(self):
+                with t.div(ref="outer"):
+                    t.p("Hello", ref="hello")
+                    if self.state["show"]:
+                        t.p("Maybe", ref="maybe")
+
+        self.page = CachePage()
+        self.page.mount(self.html)
+        self.get_element_by_id = MagicMock(wraps=self.document.getElementById)
+        self.document.getElementById = self.get_element_by_id
+
+    def test_lookups_cached(self):
+        for tag in [self.page] + list(self.page.refs.values()):
+            self.assertEqual(tag.element.getAttribute("id"), tag.element_id)
+        self.get_element_by_id.assert_not_called()
+
+    def test_redraw_refreshes_cache(self):
+        self.page.redraw()
+        self.get_element_by_id.reset_mock()
+
+        hello = self.page.refs["hello"]
+        self.assertEqual(hello.element.getAttribute("id"), hello.element_id)
+        self.assertIs(hello.element.parentNode, self.page.refs["outer"].element)
+        self.get_element_by_id.assert_not_called()
+
+    def test_redraw_keeps_cache(self):
+        self.page.redraw()
+        # Only the redrawn tag itself is looked up, however many tags it contains
+        self.assertEqual(self.get_element_by_id.call_count, 1)
+
+        for tag in [self.page] + list(self.page.refs.values()):
+            self.assertEqual(tag.element.getAttribute("id"), tag.element_id)
+        self.assertEqual(self.get_element_by_id.call_count, 1)
+
+    def test_redraw_with_many_rows_keeps_cache(self):
+        t = core.t
+
+        class TablePage(core.Page):
+            def initial(self):
+                return {"rows": list(range(100))}
+
+            def populate(self):
+                with t.table():
+                    for row in self.state["rows"]:
+                        with t.tr():
+                            t.td(str(row))
+
+        page = TablePage()
+        page.mount(self.html)
+        self.get_element_by_id.reset_mock()
+        page.redraw()
+        self.assertEqual(self.get_element_by_id.call_count, 1)
+
+    def test_cache_follows_patched_elements(self):
+        t = core.t
+
+        class ListPage(core.Page):
+            def initial(self):
+                return {"labels": ["b", "c"]}
+
+            def populate(self):
+                with t.ul():
+                    for label in self.state["labels"]:
+                        t.li(label, ref=f"item_{label}")
+
+        page = ListPage()
+        page.mount(self.html)
+        items = [page.refs["item_b"], page.refs["item_c"]]
+        for item in items:
+            item.element
+
+        # Without morphdom, elements are patched by position, so ids move between elements
+        page.state["labels"] = ["a", "b", "c"]
+        for tag in list(page.refs.values()):
+            self.assertEqual(tag.element.getAttribute("id"), tag.element_id)
+            self.assertIs(tag.element, self.document.getElementById(tag.element_id))
+        self.assertEqual(page.refs["item_b"].element.firstChild.nodeValue, "b")
+
+    def test_removed_tag_forgets_element(self):
+        maybe = self.page.refs["maybe"]
+        maybe.element
+        self.page.state["show"] = False
+        with self.assertRaises(core.ElementNotInDom):
+            maybe.element
+
+
+class TestCompactTags(DomTest):
+    def setUp(self):
+        super().setUp()
+        t = core.t
+
+        class ListPage(core.Page):
+            tag_pool_size = 10
+
+            def initial(self):
+                return {"labels": ["a", "b", "c"]}
+
+            def populate(self):
+                with t.ul(ref="list"):
+                    for label in self.state["labels"]:
+                        t.li(label, ref=f"item_{label}")
+
+        self.page = ListPage()
+        self.page.mount(self.html)
+
+    def test_plain_tags_have_no_dict(self):
+        tag = self.page.refs["list"]
+        self.assertFalse(hasattr(tag, "__dict__") and tag.__dict__)
+        self.assertIsNone(tag._manually_added_event_listeners)
+        self.assertIsNone(tag._retained_attrs)
+
+    def test_released_tags_reused(self):
+        released = self.page.refs["item_c"]
+        self.page.state["labels"] = ["a", "b"]
+        self.assertEqual(self.page._tag_pool, [released])
+        self.assertIsNone(released.parent)
+
+        self.page.state["labels"] = ["a", "b", "d"]
+        self.assertIs(self.page.refs["item_d"], released)
+        self.assertEqual(self.page._tag_pool, [])
+        self.remove_ids_from_elements(self.html)
+        self.assertIn("<ul><li>a</li><li>b</li><li>d</li></ul>", self.html.toxml())
+
+    def test_pool_off_by_default(self):
+        class PlainPage(core.Page):
+            def initial(self):
+                return {"show": True}
+
+            def populate(self):
+                if self.state["show"]:
+                    core.t.p("Hello")
+
+        page = PlainPage()
+        page.mount(self.html)
+        page.state["show"] = False
+        self.assertEqual(page._tag_pool, [])
+
+
+class FakeEvent:
+    def __init__(self, type, target, bubbles=True):
+        self.type = type
+        self.target = target
+        self.bubbles = bubbles
+        self.cancelBubble = False
+
+    def stopPropagation(self):
+        self.cancelBubble = True
+
+
+class TestEventDelegation(DomTest):
+    def setUp(self):
+        super().setUp()
+        t = core.t
+        self.clicks = []
+
+        class DelegatingPage(core.Page):
+            delegate_events = True
+
+            def initial(self):
+                return {"show_second": True, "text": ""}
+
+            def populate(page):
+                with t.div(ref="outer", on_click=lambda e: self.clicks.append("outer")):
+                    t.button("First", ref="first", on_click=lambda e: self.clicks.append("first"))
+                    if page.state["show_second"]:
+                        t.button("Second", ref="second", on_click=self.stop)
+                t.input(ref="input", bind="text")
+
+        self.page = DelegatingPage()
+        self.page.mount(self.html)
+
+    def stop(self, event):
+        self.clicks.append("second")
+        event.stopPropagation()
+
+    def click(self, ref):
+        self.page._dispatch_delegated_event(FakeEvent("click", self.page.refs[ref].element))
+
+    def test_dispatch_bubbles(self):
+        self.click("first")
+        self.assertEqual(self.clicks, ["first", "outer"])
+
+    def test_stop_propagation(self):
+        self.click("second")
+        self.assertEqual(self.clicks, ["second"])
+
+    def test_bind_delegated(self):
+        element = self.page.refs["input"].element
+        element.value = "typed"
+        self.page._dispatch_delegated_event(FakeEvent("input", element))
+        self.assertEqual(self.page.state["text"], "typed")
+
+    def test_redraw_does_not_duplicate(self):
+        self.page.redraw()
+        self.click("first")
+        self.assertEqual(self.clicks, ["first", "outer"])
+
+    def test_removed_tags_released(self):
+        second_id = self.page.refs["second"].element_id
+        self.page.state["show_second"] = False
+        self.assertNotIn(second_id, self.page._delegated_listeners["click"])
+        self.assertEqual(len(self.page._delegated_listeners["click"]), 2)
+
+
+class TestDefaultClasses(DomTest):
+    def setUp(self):
+        super().setUp()
+
+        class Card(core.Component):
+            default_classes = ["card", "shadow"]
+
+        class WideCard(Card):
+            default_classes = ["card", "wide"]
+
+        class PlainCard(Card):
+            def get_default_classes(self):
+                return ["plain"]
+
+        self.page = core.Page()
+        self.Card, self.WideCard, self.PlainCard = Card, WideCard, PlainCard
+
+    def test_default_class_set_shared(self):
+        first, second = self.Card(ref="first", page=self.page), self.Card(ref="second", page=self.page)
+        self.assertIs(first._get_default_class_set(), second._get_default_class_set())
+        self.assertEqual(first.get_render_classes({"classes": "/shadow"}), {"card"})
+
+    def test_subclasses_and_overrides(self):
+        self.assertEqual(self.Card(ref="card", page=self.page).get_render_classes({}), {"card", "shadow"})
+        self.assertEqual(self.WideCard(ref="wide", page=self.page).get_render_classes({}), {"card", "wide"})
+        self.assertEqual(self.PlainCard(ref="plain", page=self.page).get_render_classes({}), {"plain"})
+
+        card = self.Card(ref="reassigned", page=self.page)
+        card.default_classes = ["other"]
+        self.assertEqual(card.get_render_classes({"class_name": "extra"}), {"other", "extra"})
+        self.assertEqual(self.Card(ref="card2", page=self.page).get_render_classes({}), {"card", "shadow"})
+
+
+class TestScopedStyles(DomTest):
+    def setUp(self):
+        super().setUp()
+        self.head = self.document.createElement("head")
+        self.html.appendChild(self.head)
+        self.document.head = self.head
+
+        self.original_registry = core.css_registry
+        core.css_registry = core.CssRegistry()
+
+        class StyledCard(core.Component):
+            styles = {
+                "&": {"margin": "1em", "background_color": "#efefef"},
+                ".title, h2": "font-weight: bold",
+                "&:hover": ["border: solid 1px blue"],
+            }
+
+        class WideCard(StyledCard):
+            pass
+
+        self.StyledCard, self.WideCard = StyledCard, WideCard
+
+    def tearDown(self):
+        core.css_registry = self.original_registry
+
+    def test_compiled_once_per_class(self):
+        scoped_styles = self.StyledCard.get_scoped_styles()
+        scope = scoped_styles.class_name
+
+        self.assertTrue(scope.startswith("-ps-styled-card-"))
+        self.assertIs(self.StyledCard.get_scoped_styles(), scoped_styles)
+        self.assertEqual(
+            scoped_styles.rules,
+            [
+                f".{scope} {{ margin: 1em;background-color: #efefef }}",
+                f".{scope} .title, .{scope} h2 {{ font-weight: bold }}",
+                f".{scope}:hover {{ border: solid 1px blue }}",
+            ],
+        )
+        self.assertEqual(self.WideCard.get_scoped_styles().class_name, scope)
+        self.assertIsNone(core.Component.get_scoped_styles())
+
+    def test_injected_once(self):
+        page = core.Page()
+        scope = self.StyledCard.get_scoped_styles().class_name
+
+        first = self.StyledCard(ref="first", page=page).render()
+        second = self.StyledCard(ref="second", page=page, classes="extra").render()
+
+        self.assertIn(scope, first.getAttribute("class").split(" "))
+        self.assertEqual(set(second.getAttribute("class").split(" ")), {scope, "extra"})
+
+        style_elements = self.head.getElementsByTagName("style")
+        self.assertEqual(len(style_elements), 1)
+        self.assertEqual(len(style_elements[0].childNodes), 1)
+        self.assertIn(f".{scope}:hover", style_elements[0].childNodes[0].data)
+
+    def test_styles_restored_after_style_element_replaced(self):
+        page = core.Page()
+        scope = self.StyledCard.get_scoped_styles().class_name
+        self.StyledCard(ref="first", page=page).render()
+
+        self.head.removeChild(self.head.getElementsByTagName("style")[0])
+        self.StyledCard(ref="second", page=page).render()
+        self.assertEqual(len(self.head.getElementsByTagName("style")), 0)
+
+        # Checked once per mount
+        page.mount(self.html)
+
+        style_elements = self.head.getElementsByTagName("style")
+        self.assertEqual(len(style_elements), 1)
+        self.assertIn(f".{scope}:hover", style_elements[0].childNodes[0].data)
+
+    def test_no_lookups_per_instance(self):
+        t = core.t
+        self.register_component(self.StyledCard)
+
+        class CardsPage(core.Page):
+            def populate(self):
+                for i in range(200):
+                    t.styled_card(ref=f"card_{i}")
+
+        page = CardsPage()
+        get_element_by_id = MagicMock(wraps=self.document.getElementById)
+        self.document.getElementById = get_element_by_id
+
+        def style_lookups():
+            return sum(1 for call in get_element_by_id.call_args_list if call.args == ("puepy-runtime-css",))
+
+        page.mount(self.html)
+        # One lookup to add the styles, and one to check they're still there once mounted
+        self.assertEqual(style_lookups(), 2)
+
+        page.redraw()
+        self.assertEqual(style_lookups(), 2)
+
+    def test_nested_selector_lists(self):
+        scoped_styles = core.ScopedStyles("Card", {})
+        scope = f".{scoped_styles.class_name}"
+
+        self.assertEqual(
+            scoped_styles.scope_selector(":is(h1, h2) a, &:where(.a, .b)"),
+            f"{scope} :is(h1, h2) a, {scope}:where(.a, .b)",
+        )
+        self.assertEqual(scoped_styles.scope_selector("[title='a, b'], p"), f"{scope} [title='a, b'], {scope} p")
+
+
+class TestStaticComponents(DomTest):
+    def setUp(self):
+        super().setUp()
+        t = core.t
+        self.populate_calls = []
+        populate_calls = self.populate_calls
+
+        class Icon(core.Component):
+            static = True
+            enclosing_tag = "span"
+            props = ["name"]
+
+            def populate(self):
+                populate_calls.append(self.name)
+                with t.svg(classes="icon"):
+                    t.use(href=f"#{self.name}")
+
+        class IconPage(core.Page):
+            def initial(self):
+                return {"count": 0}
+
+            def populate(self):
+                t.p(f"Count: {self.state['count']}")
+                with t.div():
+                    self.icons = [
+                        t.icon(name="home"),
+                        t.icon(name="home"),
+                        t.icon(name="gear"),
+                    ]
+
+        self.register_component(Icon)
+        self.Icon, self.IconPage = Icon, IconPage
+
+    def tearDown(self):
+        core._static_templates.clear()
+
+    def test_populated_once(self):
+        page = self.IconPage()
+        page.mount(self.html)
+        self.assertEqual(sorted(self.populate_calls), ["gear", "home"])
+
+        page.state["count"] = 1
+        self.assertEqual(sorted(self.populate_calls), ["gear", "home"])
+        self.assertIn("Count: 1", self.html.toxml())
+
+    def test_content_cloned_without_ids(self):
+        page = self.IconPage()
+        page.mount(self.html)
+
+        icons = self.html.getElementsByTagName("span")
+        self.assertEqual(len(icons), 3)
+        self.assertEqual(len(set(icon.getAttribute("id") for icon in icons)), 3)
+        hrefs = [icon.getElementsByTagName("use")[0].getAttribute("href") for icon in icons]
+        self.assertEqual(hrefs, ["#home", "#home", "#gear"])
+        self.assertEqual(len(self.html.getElementsByTagName("svg")), 3)
+        self.assertFalse(any(svg.hasAttribute("id") for svg in self.html.getElementsByTagName("svg")))
+
+    def test_slot_content_not_shared(self):
+        t = core.t
+
+        @self.register_component
+        class StaticCard(core.Component):
+            static = True
+
+            def populate(self):
+                with t.div(classes="card"):
+                    self.insert_slot()
+
+        class CardPage(core.Page):
+            def populate(self):
+                with t.static_card() as card:
+                    with card.slot():
+                        t.p("first")
+                with t.static_card() as card:
+                    with card.slot():
+                        t.p("second")
+                with t.static_card():
+                    t.p("third")
+
+        CardPage().mount(self.html)
+        self.remove_ids_from_elements(self.html)
+        markup = self.html.toxml()
+        self.assertIn('<div class="card"><span><p>first</p></span></div>', markup)
+        self.assertIn('<div class="card"><span><p>second</p></span></div>', markup)
+        self.assertIn('<div class="card"/><p>third</p>', markup)
+
+    def test_templates_bounded(self):
+        t = core.t
+
+        class ManyIconsPage(core.Page):
+            def populate(self):
+                for index in range(core.STATIC_TEMPLATES_CACHE_SIZE + 10):
+                    t.icon(name=f"icon-{index}")
+
+        ManyIconsPage().mount(self.html)
+        self.assertLessEqual(len(core._static_templates), core.STATIC_TEMPLATES_CACHE_SIZE)
+        self.assertEqual(len(self.html.getElementsByTagName("use")), core.STATIC_TEMPLATES_CACHE_SIZE + 10)
+
+    def test_event_handlers_rejected(self):
+        t = core.t
+
+        @self.register_component
+        class StaticButton(core.Component):
+            static = True
+
+            def populate(self):
+                t.button("Click", on_click=lambda event: None)
+
+        class ButtonPage(core.Page):
+            def populate(self):
+                t.static_button()
+
+        with self.assertRaisesRegex(Exception, "can't contain event handlers"):
+            ButtonPage().mount(self.html)
+
+
 class TestCssClass:
     def test_cssclass_init(self):
         css_class = core.CssClass("margin: 10px", "font-size: 12px", color="red")
@@ -150,6 +794,96 @@ class TestCssClass:
         assert "color: red" in rendered_css
         assert rendered_css.endswith(" }")
 
+    def test_identical_rules_share_class_name(self):
+        assert core.CssClass(color="red").class_name == core.CssClass("color: red").class_name
+        assert core.CssClass(color="red") == core.CssClass(color="red")
+        assert core.CssClass(color="red").class_name != core.CssClass(color="blue").class_name
+
+
+class TestProps:
+    def test_coerce(self):
+        assert core.Prop("n", type=int).coerce("5") == 5
+        assert core.Prop("n", type=int).coerce(["5", "6"]) == 5
+        assert core.Prop("n", type=float).coerce("1.5") == 1.5
+        assert core.Prop("n", type=bool).coerce("false") is False
+        assert core.Prop("n", type=bool).coerce("1") is True
+        assert core.Prop("n", type=list).coerce("a") == ["a"]
+        assert core.Prop("n").coerce(["a", "b"]) == "a"
+        assert core.Prop("n", type=int).coerce(7) == 7
+
+        with pytest.raises(ValueError):
+            core.Prop("n", type=int).coerce("seven")
+
+    def test_compiled_once_per_class(self):
+        class Base(core.Page):
+            props = ["a", core.Prop("b", type=int, default_value=2)]
+
+        class Same(Base):
+            pass
+
+        class Extended(Base):
+            props = Base.props + ["c"]
+
+        assert Base.get_props() is Base.get_props()
+        assert list(Same.get_props()) == ["a", "b"]
+        assert list(Extended.get_props()) == ["a", "b", "c"]
+        assert list(Base.get_props()) == ["a", "b"]
+
+        extended = Extended(c=3)
+        assert extended.props_values == {"a": None, "b": 2, "c": 3}
+        assert extended.c == 3
+
+
+class TestCssRegistry:
+    @pytest.fixture
+    def registry(self):
+        return core.CssRegistry()
+
+    @pytest.fixture
+    def document(self, registry):
+        document = MagicMock()
+        document.getElementById.return_value = None
+        document.createElement.return_value.getAttribute.return_value = registry.token
+        return document
+
+    def test_rules_added_once(self, registry, document):
+        red, blue = core.CssClass(color="red"), core.CssClass(color="blue")
+
+        registry.add(document, [red, core.CssClass(color="red")])
+        document.createElement.assert_called_once_with("style")
+        document.createTextNode.assert_called_once_with(red.render_css())
+
+        style = document.createElement.return_value
+        document.getElementById.return_value = style
+        registry.add(document, [red])
+        style.sheet.insertRule.assert_not_called()
+
+        registry.add(document, [red, blue])
+        style.sheet.insertRule.assert_called_once_with(blue.render_css(), style.sheet.cssRules.length)
+        document.createElement.assert_called_once()
+        document.createTextNode.assert_called_once()
+
+    def test_replaced_style_element(self, registry, document):
+        red = core.CssClass(color="red")
+        registry.add(document, [red])
+
+        other_style = MagicMock()
+        document.getElementById.return_value = other_style
+        registry.add(document, [red])
+        other_style.sheet.insertRule.assert_not_called()
+
+        registry.check(document)
+        other_style.sheet.insertRule.assert_called_once_with(red.render_css(), other_style.sheet.cssRules.length)
+
+    def test_check_leaves_own_style_element(self, registry, document):
+        registry.add(document, [core.CssClass(color="red")])
+        style = document.createElement.return_value
+        document.getElementById.return_value = style
+
+        registry.check(document)
+        style.sheet.insertRule.assert_not_called()
+        document.createElement.assert_called_once()
+
 
 class TestPage:
     @pytest.fixture
@@ -1,6 +1,9 @@
 import itertools
 import pytest
-from puepy.application import DefaultIdGenerator
+
+from .dom_test import DomTest
+from puepy.application import Application, DefaultIdGenerator, RefPathIdGenerator
+from puepy.core import Component, Page, t
 
 
 class TestDefaultIdGenerator:
@@ -21,3 +24,50 @@ class TestDefaultIdGenerator:
         ids = [id_generator.get_id_for_element(None) for _ in range(100)]
         assert ids[0] == "test0"
         assert ids[99] == "test2r"
+
+
+class TestRefPathIdGenerator(DomTest):
+    def setUp(self):
+        super().setUp()
+
+        class IdCard(Component):
+            def populate(self):
+                with t.div(ref="header"):
+                    self.insert_slot("header")
+                self.insert_slot()
+
+        self.register_component(IdCard)
+
+        class IdPage(Page):
+            def populate(self):
+                for i in range(3):
+                    with t.id_card() as card:
+                        with card.slot("header"):
+                            t.h2(f"Card {i}", ref=f"title-{i}")
+                        with card.slot():
+                            t.p("Body", ref=f"body-{i}")
+
+        self.page_class = IdPage
+
+    def mount_ids(self):
+        app = Application(element_id_generator=RefPathIdGenerator())
+        app.default_page = self.page_class
+        self.setup_dom()
+        page = app.mount(self.html)
+        return [element.getAttribute("id") for element in self.html.getElementsByTagName("*")[1:]], page
+
+    def test_ids_unique(self):
+        ids, page = self.mount_ids()
+        self.assertEqual(len(ids), 18)
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertTrue(all(element_id.startswith("pp-") for element_id in ids))
+
+    def test_ids_stable(self):
+        first_ids, first_page = self.mount_ids()
+        second_ids, second_page = self.mount_ids()
+        self.assertEqual(first_ids, second_ids)
+
+    def test_ids_stable_across_redraw(self):
+        ids, page = self.mount_ids()
+        page.redraw()
+        self.assertEqual(ids, [element.getAttribute("id") for element in self.html.getElementsByTagName("*")[1:]])
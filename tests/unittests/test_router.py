@@ -2,7 +2,7 @@ import unittest
 
 from puepy import Application
 from puepy.core import Page
-from puepy.router import Router, Route, _micropython_parse_query_string
+from puepy.router import Router, Route, parse_query_string, url_unquote
 
 
 class TestRoute(unittest.TestCase):
@@ -25,6 +25,38 @@ class TestRoute(unittest.TestCase):
         url = self.route.reverse(id="123")
         self.assertEqual(url, "/base/test/123")
 
+    def test_route_reverse_query_string(self):
+        url = self.route.reverse(id="123", q="spam")
+        self.assertEqual(url, "/base/test/123?q=spam")
+
+    def test_route_reverse_inline_placeholders(self):
+        route = Route("/post-<slug>/<slug>", self.page, "post", None)
+        self.assertEqual(route.reverse(slug="hello"), "/post-hello/hello")
+        self.assertEqual(route.reverse(), "/post-<slug>/<slug>")
+
+    def test_route_reverse_memoized(self):
+        url = self.route.reverse(id="123")
+        self.assertIs(self.route.reverse(id="123"), url)
+        self.assertEqual(self.route.reverse(id=123), "/base/test/123")
+        self.assertEqual(len(self.route._reverse_cache), 2)
+
+    def test_route_reverse_unhashable_arguments(self):
+        self.assertEqual(self.route.reverse(id=["1"]), "/base/test/['1']")
+        self.assertEqual(self.route._reverse_cache, {})
+
+    def test_route_reverse_follows_link_mode(self):
+        router = Router(link_mode=Router.LINK_MODE_HASH)
+        router.add_route("/test/<id>", self.page, "test_route")
+        self.assertEqual(router.reverse("test_route", id="1"), "#/test/1")
+        router.link_mode = Router.LINK_MODE_HTML5
+        self.assertEqual(router.reverse("test_route", id="1"), "/test/1")
+
+    def test_route_path_match_recompiled(self):
+        self.route.reverse(id="123")
+        self.route.path_match = "/other/<id>"
+        self.assertEqual(self.route.reverse(id="123"), "/base/other/123")
+        self.assertTrue(self.route.match("/base/other/123")[0])
+
     def test_route_str_repr(self):
         self.assertEqual(str(self.route), "test_route")
         self.assertEqual(repr(self.route), "<Route: test_route>")
@@ -84,6 +116,12 @@ class TestRouter(unittest.TestCase):
         self.assertEqual(route.name, "test_route")
         self.assertEqual(params, {"id": "123"})
 
+    def test_match_route_query_string(self):
+        self.router.add_route("/test/<id>", self.page, "test_route")
+        route, params = self.router.match("/test/123?tag=a&tag=b%20c")
+        self.assertEqual(route.name, "test_route")
+        self.assertEqual(params, {"id": "123", "tag": ["a", "b c"]})
+
     def test_no_match_route(self):
         self.router.add_route("/test/<id>", self.page, "test_route")
         route, params = self.router.match("/other/123")
@@ -102,50 +140,77 @@ class TestRouter(unittest.TestCase):
         self.assertEqual(application.router.reverse(page), "/")
 
 
-class TestMicropythonParseQueryString(unittest.TestCase):
+class TestParseQueryString(unittest.TestCase):
     def test_simple_query(self):
         query_string = "?name=John"
         expected_output = {"name": ["John"]}
-        self.assertEqual(_micropython_parse_query_string(query_string), expected_output)
+        self.assertEqual(parse_query_string(query_string), expected_output)
 
     def test_multiple_params(self):
         query_string = "?name=John&age=30"
         expected_output = {"name": ["John"], "age": ["30"]}
-        self.assertEqual(_micropython_parse_query_string(query_string), expected_output)
+        self.assertEqual(parse_query_string(query_string), expected_output)
 
     def test_url_encoded_chars(self):
         query_string = "?name=John%20Doe&age=30"
         expected_output = {"name": ["John Doe"], "age": ["30"]}
-        self.assertEqual(_micropython_parse_query_string(query_string), expected_output)
+        self.assertEqual(parse_query_string(query_string), expected_output)
 
     def test_repeated_params(self):
         query_string = "?name=John&name=Jane"
         expected_output = {"name": ["John", "Jane"]}
-        self.assertEqual(_micropython_parse_query_string(query_string), expected_output)
+        self.assertEqual(parse_query_string(query_string), expected_output)
 
     def test_no_value_param(self):
         query_string = "?name="
         expected_output = {"name": [""]}
-        self.assertEqual(_micropython_parse_query_string(query_string), expected_output)
+        self.assertEqual(parse_query_string(query_string), expected_output)
 
     def test_no_value_multiple_params(self):
         query_string = "?name=&age="
         expected_output = {"name": [""], "age": [""]}
-        self.assertEqual(_micropython_parse_query_string(query_string), expected_output)
+        self.assertEqual(parse_query_string(query_string), expected_output)
 
     def test_plus_as_space(self):
         query_string = "?name=John+Doe&age=30"
         expected_output = {"name": ["John Doe"], "age": ["30"]}
-        self.assertEqual(_micropython_parse_query_string(query_string), expected_output)
+        self.assertEqual(parse_query_string(query_string), expected_output)
 
     def test_single_param_without_value(self):
         query_string = "?name"
-        expected_output = {"name": ""}
-        self.assertEqual(_micropython_parse_query_string(query_string), expected_output)
+        expected_output = {"name": [""]}
+        self.assertEqual(parse_query_string(query_string), expected_output)
 
+    def test_without_question_mark(self):
+        self.assertEqual(parse_query_string("name=John&&age=30"), {"name": ["John"], "age": ["30"]})
+
+    def test_empty(self):
+        self.assertEqual(parse_query_string(""), {})
+        self.assertEqual(parse_query_string("?"), {})
+
+    def test_utf8_escapes(self):
+        self.assertEqual(parse_query_string("?q=caf%C3%A9+%E2%9C%93&%C3%BC=1"), {"q": ["café ✓"], "ü": ["1"]})
+
+    def test_result_is_a_copy(self):
+        parse_query_string("?name=John")["name"].append("Jane")
+        self.assertEqual(parse_query_string("?name=John"), {"name": ["John"]})
+
+
+class TestUrlUnquote(unittest.TestCase):
+    def test_plain(self):
+        self.assertEqual(url_unquote("hello"), "hello")
+
+    def test_mixed(self):
+        self.assertEqual(url_unquote("%E6%97%A5%E6%9C%AC-go%21"), "日本-go!")
+
+    def test_invalid_escapes(self):
+        self.assertEqual(url_unquote("100%"), "100%")
+        self.assertEqual(url_unquote("%zz%4"), "%zz%4")
+        self.assertEqual(url_unquote("%41%+1"), "A% 1")
+
+    def test_invalid_utf8(self):
+        self.assertEqual(url_unquote("%FF"), "\xff")
 
-if __name__ == "__main__":
-    unittest.main()
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,7 +1,11 @@
+import asyncio
+import sys
+import types
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import puepy.storage as storage
+from puepy.reactivity import ReactiveDict
 
 
 class TestBrowserStorage(unittest.TestCase):
@@ -73,5 +77,411 @@ class TestBrowserStorage(unittest.TestCase):
         self.assertEqual(repr(self.bs), "<{}>".format(str(self.bs)))
 
 
+class FakeStorage:
+    def __init__(self):
+        self.data = {}
+        self.reads = 0
+
+    def getItem(self, key):
+        self.reads += 1
+        return self.data.get(key)
+
+    def setItem(self, key, value):
+        self.data[key] = value
+
+    def removeItem(self, key):
+        self.data.pop(key, None)
+
+    def clear(self):
+        self.data.clear()
+
+
+class FakeStorageEvent:
+    def __init__(self, key, storage_area):
+        self.key = key
+        self.storageArea = storage_area
+
+
+class TestTypedBrowserStorage(unittest.TestCase):
+    def setUp(self):
+        self.target = FakeStorage()
+        self.bs = storage.BrowserStorage(self.target, "typed", serializer=storage.JsonSerializer())
+
+    def test_types_preserved(self):
+        self.bs["count"] = 5
+        self.bs["items"] = [1, "two", None]
+        self.bs["config"] = {"dark": True}
+
+        self.assertEqual(self.target.data["count"], "5")
+        self.assertEqual(self.target.data["config"], '{"dark": true}')
+
+        self.bs.invalidate()
+        self.assertEqual(self.bs["count"], 5)
+        self.assertEqual(self.bs["items"], [1, "two", None])
+        self.assertEqual(self.bs["config"], {"dark": True})
+
+    def test_non_json_values_read_as_strings(self):
+        self.target.data["legacy"] = "hello"
+        self.assertEqual(self.bs["legacy"], "hello")
+
+    def test_reads_cached(self):
+        self.target.data["theme"] = '"dark"'
+        self.assertEqual(self.bs["theme"], "dark")
+        self.assertEqual(self.bs.get("theme"), "dark")
+        self.assertIn("theme", self.bs)
+        self.assertEqual(self.target.reads, 1)
+
+        self.assertNotIn("missing", self.bs)
+        self.assertIsNone(self.bs.get("missing"))
+        self.assertEqual(self.target.reads, 2)
+
+    def test_write_through(self):
+        self.bs["theme"] = "light"
+        self.assertEqual(self.bs["theme"], "light")
+        self.assertEqual(self.target.reads, 0)
+
+        del self.bs["theme"]
+        self.assertNotIn("theme", self.target.data)
+        self.assertNotIn("theme", self.bs)
+        self.assertEqual(self.bs.pop("theme", "default"), "default")
+        with self.assertRaises(KeyError):
+            self.bs.pop("theme")
+
+    def test_storage_events_invalidate(self):
+        self.bs["theme"] = "light"
+        self.bs["size"] = 10
+
+        # Another tab changes the theme
+        self.target.data["theme"] = '"dark"'
+        self.bs._on_storage(FakeStorageEvent("theme", self.target))
+        self.assertEqual(self.bs["theme"], "dark")
+        self.assertEqual(self.bs["size"], 10)
+
+        # Another tab clears its storage
+        self.target.data.clear()
+        self.bs._on_storage(FakeStorageEvent(None, self.target))
+        self.assertNotIn("size", self.bs)
+
+    def test_other_storage_events_ignored(self):
+        self.bs["theme"] = "light"
+        reads = self.target.reads
+
+        # Eg, sessionStorage changing in another tab, when this wraps localStorage
+        self.bs._on_storage(FakeStorageEvent("theme", FakeStorage()))
+        self.bs._on_storage(FakeStorageEvent(None, FakeStorage()))
+        self.assertEqual(self.bs["theme"], "light")
+        self.assertEqual(self.target.reads, reads)
+
+
+class FakeTimers:
+    def __init__(self):
+        self.callbacks = []
+
+    def __call__(self, callback, delay):
+        self.callbacks.append(callback)
+
+    def run(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+class TestPersistedState(unittest.TestCase):
+    def setUp(self):
+        self.target = FakeStorage()
+        self.target.data["app.theme"] = '"dark"'
+        self.bs = storage.BrowserStorage(self.target, "typed", serializer=storage.JsonSerializer())
+
+        self.timers = FakeTimers()
+        self.original_set_timeout = storage.setTimeout
+        storage.setTimeout = self.timers
+
+        self.state = ReactiveDict({"theme": "light", "count": 0, "draft": ""})
+        self.persisted = self.bs.bind(self.state, keys=["theme", "count"], prefix="app.")
+
+        self.writes = []
+        set_item = self.target.setItem
+        self.target.setItem = lambda key, value: (self.writes.append(key), set_item(key, value))
+
+    def tearDown(self):
+        storage.setTimeout = self.original_set_timeout
+
+    def test_restored(self):
+        self.assertEqual(self.state["theme"], "dark")
+        self.assertEqual(self.state["count"], 0)
+
+    def test_writes_debounced(self):
+        self.state["count"] = 1
+        self.state["count"] = 2
+        with self.state.mutate("theme", "count"):
+            self.state["theme"] = "blue"
+            self.state["count"] = 3
+        self.state["draft"] = "not persisted"
+
+        self.assertEqual(self.writes, [])
+        self.assertEqual(len(self.timers.callbacks), 1)
+
+        self.timers.run()
+        self.assertEqual(sorted(self.writes), ["app.count", "app.theme"])
+        self.assertEqual(self.target.data["app.count"], "3")
+        self.assertEqual(self.target.data["app.theme"], '"blue"')
+
+    def test_sync_from_other_tabs(self):
+        self.target.data["app.count"] = "7"
+        self.persisted._on_storage(FakeStorageEvent("app.count", self.target))
+        self.assertEqual(self.state["count"], 7)
+
+        self.target.data.pop("app.theme")
+        self.persisted._on_storage(FakeStorageEvent("app.theme", self.target))
+        self.assertNotIn("theme", self.state)
+
+        self.timers.run()
+        self.assertEqual(self.writes, [])
+
+    def test_other_storage_events_ignored(self):
+        other = FakeStorage()
+        other.data["app.count"] = "7"
+        self.persisted._on_storage(FakeStorageEvent("app.count", other))
+        self.assertEqual(self.state["count"], 0)
+
+    def test_stop(self):
+        self.state["count"] = 5
+        self.persisted.stop()
+        self.assertEqual(self.target.data["app.count"], "5")
+
+        self.state["count"] = 6
+        self.timers.run()
+        self.assertEqual(self.target.data["app.count"], "5")
+
+
+class TestMemoryStorage(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.storage = storage.MemoryStorage()
+
+    async def test_get_and_set(self):
+        await self.storage.set("config", {"page_size": 50})
+        self.assertEqual(await self.storage.get("config"), {"page_size": 50})
+        self.assertEqual(self.storage.data["config"], '{"page_size": 50}')
+
+        self.assertIsNone(await self.storage.get("missing"))
+        self.assertEqual(await self.storage.get("missing", 5), 5)
+        self.assertTrue(await self.storage.contains("config"))
+        self.assertFalse(await self.storage.contains("missing"))
+
+    async def test_bulk(self):
+        await self.storage.put_many({"a": 1, "b": [2], "c": None})
+        self.assertEqual(await self.storage.get_many(["a", "c", "missing"]), {"a": 1, "c": None})
+        self.assertEqual(await self.storage.count(), 3)
+        self.assertEqual(sorted(await self.storage.keys()), ["a", "b", "c"])
+        items = sorted(await self.storage.items(), key=lambda item: item[0])
+        self.assertEqual(items, [("a", 1), ("b", [2]), ("c", None)])
+
+        await self.storage.delete_many(["a", "missing"])
+        self.assertEqual(sorted(await self.storage.keys()), ["b", "c"])
+
+    async def test_delete_and_pop(self):
+        await self.storage.set("key", "value")
+        self.assertEqual(await self.storage.pop("key"), "value")
+        self.assertEqual(await self.storage.pop("key", "default"), "default")
+        with self.assertRaises(KeyError):
+            await self.storage.pop("key")
+        with self.assertRaises(KeyError):
+            await self.storage.delete("key")
+
+        await self.storage.set("key", "value")
+        await self.storage.clear()
+        self.assertEqual(await self.storage.count(), 0)
+
+
+class FakeRequest:
+    def __init__(self, result=None):
+        self.result = result
+        self.error = None
+
+
+class FakeObjectStore:
+    def __init__(self, data):
+        self.data = data
+
+    def get(self, key):
+        return FakeRequest(self.data.get(key))
+
+    def put(self, text, key):
+        self.data[key] = text
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def getAllKeys(self):
+        return FakeRequest(list(self.data.keys()))
+
+    def getAll(self):
+        return FakeRequest(list(self.data.values()))
+
+    def clear(self):
+        self.data.clear()
+
+    def count(self):
+        return FakeRequest(len(self.data))
+
+
+class FakeTransaction:
+    """
+    Completes, or aborts with the database's `abort_error`, once the caller awaits it, as IDBTransaction does.
+    """
+
+    def __init__(self, db, mode):
+        self.db = db
+        self.error = None
+        self.oncomplete = self.onerror = self.onabort = None
+        self.data = dict(db.data)
+        asyncio.get_running_loop().call_soon(self._finish)
+
+    def objectStore(self, name):
+        return FakeObjectStore(self.data)
+
+    def _finish(self):
+        if self.db.abort_error:
+            self.error = self.db.abort_error
+            self.onabort(None)
+        else:
+            self.db.data.update(self.data)
+            for key in set(self.db.data) - set(self.data):
+                del self.db.data[key]
+            self.oncomplete(None)
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.version = 1
+        self.stores = set()
+        self.data = {}
+        self.abort_error = None
+        self.closed = False
+        self.onversionchange = None
+        self.objectStoreNames = types.SimpleNamespace(contains=lambda name: name in self.stores)
+
+    def createObjectStore(self, name):
+        self.stores.add(name)
+
+    def transaction(self, store, mode):
+        return FakeTransaction(self, mode)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeIndexedDB:
+    """
+    While `blocked`, open requests fire "onblocked" and wait for `unblock()`, as when another tab holds an older
+    version of the database open.
+    """
+
+    def __init__(self):
+        self.databases = []
+        self.blocked = False
+        self._waiting = []
+
+    def unblock(self):
+        self.blocked = False
+        waiting, self._waiting = self._waiting, []
+        for finish in waiting:
+            finish()
+
+    def open(self, name, version=None):
+        request = FakeRequest()
+        request.onsuccess = request.onerror = request.onblocked = request.onupgradeneeded = None
+
+        def finish():
+            if self.blocked:
+                if request.onblocked:
+                    request.onblocked(None)
+                self._waiting.append(finish)
+                return
+            db = FakeDatabase()
+            if self.databases:
+                previous = self.databases[-1]
+                db.version, db.stores, db.data = previous.version, previous.stores, previous.data
+            self.databases.append(db)
+            request.result = db
+            if version is not None and version > db.version:
+                db.version = version
+                request.onupgradeneeded(None)
+            request.onsuccess(None)
+
+        asyncio.get_running_loop().call_soon(finish)
+        return request
+
+
+class TestIndexedDBStorage(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.indexed_db = FakeIndexedDB()
+        js = types.ModuleType("js")
+        js.indexedDB = self.indexed_db
+        modules = patch.dict(sys.modules, {"js": js})
+        modules.start()
+        self.addCleanup(modules.stop)
+        self.storage = storage.IndexedDBStorage("app", "products")
+
+    async def test_round_trip(self):
+        await self.storage.put_many({"a": 1, "b": [2]})
+        self.assertEqual(await self.storage.get_many(["a", "b", "missing"]), {"a": 1, "b": [2]})
+        self.assertEqual(await self.storage.count(), 2)
+
+        await self.storage.delete("a")
+        self.assertEqual(await self.storage.items(), [("b", [2])])
+
+        # The store didn't exist, so the database was upgraded to create it
+        self.assertEqual(len(self.indexed_db.databases), 2)
+        self.assertTrue(self.indexed_db.databases[0].closed)
+
+    async def test_aborted_transaction_raises(self):
+        await self.storage.set("a", 1)
+        self.indexed_db.databases[-1].abort_error = "QuotaExceededError"
+
+        with self.assertRaisesRegex(OSError, "QuotaExceededError"):
+            await asyncio.wait_for(self.storage.put_many({"b": 2}), 1)
+        with self.assertRaises(OSError):
+            await asyncio.wait_for(self.storage.set("c", 3), 1)
+
+        self.indexed_db.databases[-1].abort_error = None
+        self.assertEqual(await self.storage.keys(), ["a"])
+
+    async def test_blocked_open_waits(self):
+        self.indexed_db.blocked = True
+        getting = asyncio.ensure_future(self.storage.get("a", "missing"))
+        for _ in range(3):
+            await asyncio.sleep(0)
+        self.assertFalse(getting.done())
+
+        self.indexed_db.unblock()
+        self.assertEqual(await asyncio.wait_for(getting, 1), "missing")
+
+    async def test_blocked_open_timeout(self):
+        self.storage.open_timeout = 0.01
+        self.indexed_db.blocked = True
+        with self.assertRaisesRegex(OSError, "Timed out"):
+            await self.storage.get("a")
+
+        # If the abandoned request succeeds later, its connection is closed rather than left open
+        self.indexed_db.unblock()
+        db = self.indexed_db.databases[-1]
+        self.assertTrue(db.closed)
+        self.assertIsNone(self.storage._db)
+
+    async def test_version_change_closes(self):
+        await self.storage.set("a", 1)
+        db = self.indexed_db.databases[-1]
+
+        db.onversionchange(None)
+        self.assertTrue(db.closed)
+        self.assertIsNone(db.onversionchange)
+
+        # Reopened on next use
+        self.assertEqual(await self.storage.get("a"), 1)
+        self.assertIsNot(self.indexed_db.databases[-1], db)
+        self.assertIsNotNone(self.indexed_db.databases[-1].onversionchange)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+from .dom_test import DomTest
+from puepy.application import Application
+from puepy.core import Page, t
+from puepy.router import Router
+from puepy.timing import Timings
+
+
+class TestTimings(unittest.TestCase):
+    def test_measure(self):
+        timings = Timings()
+        with timings.measure("populate", "target"):
+            pass
+        (timing,) = timings.entries()
+        self.assertEqual(timing.name, "populate")
+        self.assertEqual(timing.target, "target")
+        self.assertGreaterEqual(timing.duration, 0)
+
+    def test_ring_buffer(self):
+        timings = Timings(size=3)
+        for i in range(5):
+            timings.record(f"phase{i}", None, i, i + 1)
+        self.assertEqual([timing.name for timing in timings.entries()], ["phase2", "phase3", "phase4"])
+
+        timings.clear()
+        self.assertEqual(timings.entries(), [])
+
+    def test_size_validated(self):
+        with self.assertRaises(ValueError):
+            Timings(size=0)
+        Timings(size=1).record("patch", None, 0, 1)
+
+    def test_listener(self):
+        timings = Timings()
+        recorded = []
+        timings.listener.add_callback(recorded.append)
+        timings.record("render", "div", 1.0, 3.5)
+        self.assertEqual(recorded[0].duration, 2.5)
+
+
+class TestApplicationTimings(DomTest):
+    def setUp(self):
+        super().setUp()
+        self.app = Application(timings=Timings())
+        self.app.install_router(Router)
+
+        @self.app.page("/counter")
+        class CounterPage(Page):
+            def initial(self):
+                return {"count": 0}
+
+            def populate(self):
+                t.p(f"Count: {self.state['count']}")
+
+    def test_navigation_timings(self):
+        self.app.mount(self.html, path="/counter")
+        names = [timing.name for timing in self.app.timings.entries()]
+        self.assertEqual(
+            names,
+            [
+                "route_match",
+                "prop_coercion",
+                "precheck",
+                "populate",
+                "render",
+                "patch",
+                "on_ready",
+                "css",
+                "mount",
+                "navigation",
+            ],
+        )
+
+    def test_redraw_timings(self):
+        self.app.mount(self.html, path="/counter")
+        self.app.timings.clear()
+        self.app.active_page.state["count"] = 1
+        names = [timing.name for timing in self.app.timings.entries()]
+        self.assertEqual(names, ["precheck", "populate", "render", "patch", "redraw"])
+
+
+if __name__ == "__main__":
+    unittest.main()
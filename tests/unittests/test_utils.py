@@ -2,6 +2,7 @@ import unittest
 from xml.dom import getDOMImplementation
 
 from puepy import CssClass
+from puepy import util
 from puepy.util import merge_classes, _extract_event_handlers, patch_dom_element
 from .dom_tools import node_to_dict
 
@@ -52,6 +53,57 @@ class TestMergeStringClasses(unittest.TestCase):
         self.assertSetEqual(result, {"class1", "class2"})
 
 
+class TestMergeClassesMemo(unittest.TestCase):
+    def setUp(self):
+        util._merge_classes_cache.clear()
+
+    def test_memoized(self):
+        merge_classes({"class1", "class2"}, "/class2", {"class3": True})
+        self.assertEqual(len(util._merge_classes_cache), 1)
+
+        result = merge_classes({"class1", "class2"}, "/class2", {"class3": True})[0]
+        self.assertSetEqual(result, {"class1", "class3"})
+        self.assertEqual(len(util._merge_classes_cache), 1)
+
+    def test_keyed_on_contents(self):
+        classes = ["class1"]
+        self.assertSetEqual(merge_classes(classes)[0], {"class1"})
+        classes.append("class2")
+        self.assertSetEqual(merge_classes(classes)[0], {"class1", "class2"})
+        self.assertSetEqual(merge_classes({"class1": True})[0], {"class1"})
+        self.assertSetEqual(merge_classes({"class1": False})[0], set())
+
+    def test_result_not_shared(self):
+        merge_classes("class1")[0].pop()
+        self.assertSetEqual(merge_classes("class1")[0], {"class1"})
+
+    def test_unmemoizable_options(self):
+        result = merge_classes(iter(["class1"]), "class2")[0]
+        self.assertSetEqual(result, {"class1", "class2"})
+        self.assertEqual(len(util._merge_classes_cache), 0)
+
+
+class TestImportObject(unittest.TestCase):
+    def test_paths(self):
+        from puepy.components import VirtualList
+
+        self.assertIs(util.import_object("puepy.components:VirtualList"), VirtualList)
+        self.assertIs(util.import_object("puepy.components.VirtualList"), VirtualList)
+
+    def test_missing(self):
+        with self.assertRaises(ImportError):
+            util.import_object("puepy.no_such_module:Thing")
+        with self.assertRaises(AttributeError):
+            util.import_object("puepy.components:NoSuchThing")
+
+
+class TestStableHash(unittest.TestCase):
+    def test_known_values(self):
+        # Ids and class names built on these hashes must match on every runtime
+        self.assertEqual(util.stable_hash(""), 0xCBF29CE484222325)
+        self.assertEqual(util.stable_hash("IdPage/__div_1"), 3226783555262128733)
+
+
 class TestExtractEventHandlers(unittest.TestCase):
     def test_extract_event_handlers(self):
         kwargs = {"on_click": "click", "on_hover": "hover", "not_event": "value"}
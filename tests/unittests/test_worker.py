@@ -0,0 +1,29 @@
+import unittest
+
+from puepy.worker import run_in_worker, worker_function
+
+
+@worker_function
+def add_up(numbers, scale=1):
+    return {"total": sum(numbers) * scale}
+
+
+@worker_function
+async def shout(text):
+    return text.upper()
+
+
+class TestRunInWorker(unittest.IsolatedAsyncioTestCase):
+    async def test_sync_function(self):
+        self.assertEqual(await run_in_worker("numbers", "add_up", [1, 2, 3], scale=2), {"total": 12})
+
+    async def test_async_function(self):
+        self.assertEqual(await run_in_worker("text", "shout", "hello"), "HELLO")
+
+    async def test_arguments_sent_as_json(self):
+        with self.assertRaises(TypeError):
+            await run_in_worker("numbers", "add_up", {1, 2})
+
+    async def test_unknown_function(self):
+        with self.assertRaises(ValueError):
+            await run_in_worker("numbers", "subtract")